@@ -12,6 +12,11 @@ from doc_quality.scripts.download_doc import main as download
 from doc_quality.scripts.extract_metadata import main as metadata
 from doc_quality.scripts.topic_modeling import main as topics
 from doc_quality.scripts.full_pipeline import main as full_pipeline
+from doc_quality.scripts.rescore import main as rescore
+from doc_quality.scripts.benchmark import main as benchmark
+from doc_quality.scripts.standin_server import main as standin
+from doc_quality.scripts.export_metadata import main as export
+from doc_quality.pipeline.metadata.standin import LATENCIES
 
 settings = Settings()
 
@@ -21,26 +26,71 @@ sub = parser.add_subparsers(dest="command", required=True, help="Available comma
 # --- DOWNLOAD ---
 p_dl = sub.add_parser("download", help="Download document PDFs")
 p_dl.add_argument("--n", type=int, default=-1, help="Max PDFs to download")
-p_dl.add_argument("--input", type=Path, default=Path(settings.ko_json_path), help="Input JSON file with URLs")
+p_dl.add_argument("--input", type=Path, default=Path(settings.ko_json_path), help="Input JSON (array) or JSONL file with URLs")
 p_dl.add_argument("--output", type=Path, default=Path(settings.ko_dir), help="PDF Output directory")
+p_dl.add_argument("--concurrency", type=int, default=settings.download_concurrency, help="Max simultaneous downloads (1 = sequential)")
+p_dl.add_argument("--shard_depth", type=int, default=settings.download_shard_depth, help="Hash-prefix subdirectory levels of the stored files (0 = flat)")
 
 # --- METADATA ---
 p_meta = sub.add_parser("metadata", help="Extract metadata from PDFs")
 p_meta.add_argument("--input_dir", type=Path, default=Path(settings.ko_dir), help="PDF Input directory")
-p_meta.add_argument("--output_valid", type=Path, default=Path(settings.valid_meta_dir), help="Valid JSON output")
-p_meta.add_argument("--output_invalid", type=Path, default=Path(settings.invalid_meta_dir), help="Invalid JSON output")
+p_meta.add_argument("--store_dir", type=Path, default=Path(settings.result_store_dir), help="Result store (valid and invalid records)")
+p_meta.add_argument("--output_valid", type=Path, default=Path(settings.valid_meta_dir), help="Valid JSON output (with --export_json)")
+p_meta.add_argument("--output_invalid", type=Path, default=Path(settings.invalid_meta_dir), help="Invalid JSON output (with --export_json)")
+p_meta.add_argument("--export_json", action="store_true", default=settings.metadata_json_export, help="Also write one JSON file per document")
 p_meta.add_argument("--n_meta", type=int, default=-1, help="Max KOs to extract metadata from")
+p_meta.add_argument("--seed", type=int, default=settings.metadata_sample_seed, help="Seed of the random sample of n_meta KOs")
+p_meta.add_argument("--workers", type=int, default=settings.metadata_workers, help="Processes for structural validation")
+p_meta.add_argument("--concurrency", type=int, default=settings.metadata_concurrency, help="Metadata extraction requests in flight")
 
 # --- TOPICS ---
 p_top = sub.add_parser("topics", help="Run topic modeling on valid metadata")
-p_top.add_argument("--input_dir", type=Path, default=Path(settings.valid_meta_dir), help="Input directory of valid metadata JSONs")
+p_top.add_argument("--input_dir", type=Path, default=Path(settings.result_store_dir), help="Result store (or directory of valid metadata JSONs)")
 p_top.add_argument("--output_dir", type=Path, default=Path(settings.topic_model_dir), help="Output directory for topic model")
 
+# --- EXPORT ---
+p_exp = sub.add_parser("export", help="Export the result store as one JSON file per document")
+p_exp.add_argument("--store_dir", type=Path, default=Path(settings.result_store_dir), help="Result store")
+p_exp.add_argument("--output_valid", type=Path, default=Path(settings.valid_meta_dir), help="Valid JSON output")
+p_exp.add_argument("--output_invalid", type=Path, default=Path(settings.invalid_meta_dir), help="Invalid JSON output")
+
+# --- RESCORE ---
+p_res = sub.add_parser("rescore", help="Rescore processed documents with new heuristic thresholds")
+p_res.add_argument("--features", type=Path, default=Path(settings.feature_store_path), help="Feature store written by the metadata stage")
+p_res.add_argument("--set", action="append", metavar="NAME=VALUE", help="Threshold override, e.g. MIN_SCORE=7 (default: as in docpdf.py)")
+p_res.add_argument("--output", type=Path, default=None, help="CSV with the rescored typology/score/verdict of every document")
+
+# --- BENCHMARK ---
+p_bench = sub.add_parser("benchmark", help="Compare the PDF text-extraction backends (speed, memory, verdicts)")
+p_bench.add_argument("--input_dir", type=Path, default=Path(settings.ko_dir), help="PDF sample directory")
+p_bench.add_argument("--n", type=int, default=100, help="Documents sampled from the input directory (-1: all)")
+p_bench.add_argument("--seed", type=int, default=0, help="Seed of the sample, to compare runs on the same documents")
+p_bench.add_argument("--backends", type=str, default=None, help="Comma-separated backends (default: every installed one)")
+p_bench.add_argument("--show", type=int, default=10, help="Documents listed per backend whose verdict differs")
+
+# --- METADATA STAND-IN ---
+p_std = sub.add_parser("standin", help="Run a local stand-in of the metadata extraction service (load testing)")
+p_std.add_argument("--host", type=str, default="127.0.0.1")
+p_std.add_argument("--port", type=int, default=settings.standin_port)
+p_std.add_argument("--latency", choices=LATENCIES, default="lognormal", help="Latency distribution")
+p_std.add_argument("--latency_mean", type=float, default=2.0, help="Mean latency (seconds)")
+p_std.add_argument("--latency_sigma", type=float, default=0.5, help="Latency spread")
+p_std.add_argument("--error_rate", type=float, default=0.0, help="Fraction of requests answered with a 500")
+p_std.add_argument("--throttle_rate", type=float, default=0.0, help="Fraction of requests answered with a 429")
+p_std.add_argument("--max_rps", type=float, default=0.0, help="Requests accepted per second (0 = unlimited)")
+p_std.add_argument("--max_concurrent", type=int, default=0, help="Requests handled at once (0 = unlimited)")
+p_std.add_argument("--seed", type=int, default=None, help="Seed, for reproducible runs")
+
 # --- FULL PIPELINE (ALL) ---
 p_all = sub.add_parser("all", help="Run full pipeline: download -> metadata -> topics")
 p_all.add_argument("--n", type=int, default=-1)
 p_all.add_argument("--json_source", type=Path, default=Path(settings.ko_json_path))
 p_all.add_argument("--pdf_dir", type=Path, default=Path(settings.ko_dir))
+p_all.add_argument("--concurrency", type=int, default=settings.download_concurrency)
+p_all.add_argument("--workers", type=int, default=settings.metadata_workers)
+p_all.add_argument("--meta_concurrency", type=int, default=settings.metadata_concurrency)
+p_all.add_argument("--store_dir", type=Path, default=Path(settings.result_store_dir))
+p_all.add_argument("--export_json", action="store_true", default=settings.metadata_json_export)
 p_all.add_argument("--valid_dir", type=Path, default=Path(settings.valid_meta_dir))
 p_all.add_argument("--invalid_dir", type=Path, default=Path(settings.invalid_meta_dir))
 p_all.add_argument("--topic_dir", type=Path, default=Path(settings.topic_model_dir))
@@ -72,6 +122,18 @@ def main():
     elif args.command == "topics":
         topics(args, config)
         
+    elif args.command == "export":
+        export(args, config)
+        
+    elif args.command == "rescore":
+        rescore(args, config)
+        
+    elif args.command == "benchmark":
+        benchmark(args, config)
+        
+    elif args.command == "standin":
+        standin(args, config)
+        
     elif args.command == "all":
         full_pipeline(args, config)
         
@@ -20,15 +20,51 @@ class Settings(BaseSettings):
     ############## PORT
     api_port: int = 30600
     api_log_level: str = 'debug'
+    standin_port: int = 30601 # local stand-in of the metadata extraction service (load testing)
     ############## METADATA
     prompt_path : Path = ROOT_DIR / "config" / "prompt.txt"
     extraction_endpoint : str = "metadata_extraction_endpoint_url}"
+    metadata_workers: int = 1 # processes for structural validation (1 = in-process)
+    metadata_sample_seed: int = 0 # seed of the random sample of documents (n_meta), for reproducible runs
+    metadata_concurrency: int = 4 # extraction requests in flight at once (pooled connections)
+    metadata_timeout: float = 60.0 # seconds per request
+    metadata_retries: int = 3 # on connection errors, timeouts and 429/5xx answers
+    metadata_backoff: float = 1.0 # base seconds between retries (doubled each time, jittered)
+    metadata_payload: str = "pdf" # what is sent of each document: "pdf" (whole file) or "excerpt" (title, start and end of its text)
+    metadata_excerpt_tokens: int = 2000 # size of the excerpt (~4 characters per token)
+    metadata_excerpt_gzip: bool = False # gzip the excerpt (the endpoint must accept it)
+    metadata_json_export: bool = False # also write each record as its own JSON file (valid/invalid meta dirs), besides the result store
+    metadata_queue_size: int = 32 # structurally valid documents waiting for extraction (with metadata_workers > 1)
+    ############## PDF
+    pdf_backend: str = "pypdf" # text-extraction library: pypdf, pymupdf or pypdfium2 (see the benchmark command)
+    pdf_page_workers: int = 1 # processes extracting the pages of one large PDF (1 = off)
+    pdf_parallel_page_threshold: int = 100 # pages above which a PDF is extracted in parallel
+    pdf_early_exit: bool = False # decide from the first/last pages when the rest cannot change the verdict
+    pdf_max_seconds: float = 60.0 # per-document parsing budgets (0 = unlimited): wall-clock time,
+    pdf_max_pages: int = 2000 # pages,
+    pdf_max_decompressed_bytes: int = 500_000_000 # and decompressed page contents (500MB)
+    text_cache: bool = True # keep the extracted text of each document, to rescore without parsing again
+    ############## CACHE
+    result_cache: bool = True # answer already assessed documents (same contents and versions) from cache
+    result_cache_size: int = 1024 # results kept in memory, on top of the on-disk store
+    metadata_cache: bool = True # reuse extraction responses (same document contents, prompt and endpoint)
     ############## BERTOPIC
     topic_model: Path = ROOT_DIR / "data" / "topic"
     embedding_model : str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2" # same as the one used in topic model training
     llm_model : str = "Qwen/Qwen2.5-7B-Instruct"
     min_topic_prob: float = 0.5
     topic_targets: list = ["topic1", "topic2", "..."] 
+    ############## DOWNLOAD
+    download_concurrency: int = 8 # max simultaneous downloads (1 = sequential)
+    download_host_rate: float = 2.0 # requests per second, per host
+    download_host_burst: int = 4
+    download_host_connections: int = 2 # max simultaneous downloads, per host
+    download_breaker_threshold: int = 5 # consecutive failures before a host is deferred
+    download_lookahead: int = 2000 # URLs read ahead of the downloads, to spread them over hosts
+    download_max_bytes: int = 100_000_000 # bodies above this size are aborted (100MB)
+    download_revalidate: bool = True # conditional GET (ETag/Last-Modified) for already stored files
+    content_addressed_store: bool = True # store files as {sha256}.pdf + a URL manifest (False: URL file names)
+    download_shard_depth: int = 0 # hash-prefix subdirectories of the content-addressed store (0 = flat, 2 = ab/cd/{sha256}.pdf)
     ############## PROJECT
     project_name: str = 'Doc Quality Assessment'
     ############## DIRECTORIES
@@ -36,7 +72,12 @@ class Settings(BaseSettings):
     ko_json_path : Path = ROOT_DIR / "data" / "{FILE WITH DOC URLS}.json"
     valid_meta_dir : Path = ROOT_DIR / "data" / "metadata" / "valid_meta/"
     invalid_meta_dir : Path = ROOT_DIR / "data" / "metadata" / "invalid_meta/"
+    result_store_dir : Path = ROOT_DIR / "data" / "metadata" / "store/"
     topic_model_dir : Path = ROOT_DIR / "data" / "models" / "bertopic/"
+    text_cache_dir : Path = ROOT_DIR / "data" / "text_cache/"
+    result_cache_dir : Path = ROOT_DIR / "data" / "result_cache/"
+    metadata_cache_dir : Path = ROOT_DIR / "data" / "metadata_cache/"
+    feature_store_path : Path = ROOT_DIR / "data" / "metadata" / "features.parquet"
     
 @lru_cache()
 def get_settings():
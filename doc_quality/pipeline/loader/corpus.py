@@ -0,0 +1,73 @@
+# corpus.py
+# /enumeration and sampling of a (possibly sharded) directory of documents/
+# adriana r.f.
+# feb-2026
+
+import os
+import heapq
+import hashlib
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+def shard_path(filename: str, depth: int) -> str:
+    """
+    Path of a content-addressed file ({sha256}.pdf) under {depth} levels of hash-prefix directories,
+    e.g. ab/cd/abcd....pdf for depth 2, so that no directory grows beyond a few thousand entries.
+    """
+    prefixes = [filename[2 * i:2 * i + 2] for i in range(max(0, depth))]
+    return os.path.join(*prefixes, filename)
+
+def iter_documents(input_dir: str, suffixes: Tuple[str, ...] = (".pdf",)) -> Iterator[Path]:
+    """
+    Streams the documents of a directory and its (shard) subdirectories, as they are listed:
+    nothing is held in memory but the directories still to visit. Hidden entries (e.g. partial downloads) are skipped.
+    """
+    pending = [str(input_dir)]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.name.lower().endswith(suffixes):
+                    yield Path(entry.path)
+
+def reservoir_sample(items: Iterable[Path], n: int, seed: int = 0) -> Tuple[List[Path], int]:
+    """
+    {n} documents out of a stream of them (and how many there were), keeping only {n} at a time.
+    Each document is ranked by a seeded hash of its name, so the same seed picks the same documents
+    whatever the order they are listed in (another filesystem, a sharded copy...).
+    """
+    heap: List[Tuple[int, str, Path]] = [] # (-rank, name, path): the n lowest ranks so far
+    seen = 0
+    for path in items:
+        seen += 1
+        rank = int.from_bytes(hashlib.blake2b(f"{seed}:{path.name}".encode("utf-8"), digest_size=8).digest(), "big")
+        if len(heap) < n:
+            heapq.heappush(heap, (-rank, path.name, path))
+        elif -rank > heap[0][0]:
+            heapq.heapreplace(heap, (-rank, path.name, path))
+    return sorted((path for _, _, path in heap), key=lambda p: p.name), seen
+
+def largest_first(items: Iterable[Path], window: int) -> Iterator[Path]:
+    """
+    Streams documents biggest first, within a window of {window} of them: the biggest of the window goes
+    each time a new one comes in. A large document is thus started early (not left running alone at
+    the end of a batch), while only {window} documents are held, and sized, ahead of the ones being processed.
+    """
+    heap: List[Tuple[int, str, Path]] = [] # (-size, name, path)
+    for path in items:
+        try:
+            size = path.stat().st_size
+        except OSError:
+            size = 0
+        heapq.heappush(heap, (-size, path.name, path))
+        if len(heap) > window:
+            yield heapq.heappop(heap)[2]
+    while heap:
+        yield heapq.heappop(heap)[2]
@@ -4,32 +4,99 @@
 # jan-2026
 
 import os
+import hashlib
+import threading
 import requests
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from urllib.parse import urlparse
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from typing import Optional
+from typing import Optional, Dict, Tuple
 from ...config.settings import Settings
+from .manifest import DownloadManifest, DONE, FAILED
+from .corpus import shard_path
+
+# statuses a host answers with when it wants us to slow down
+THROTTLE_STATUSES = (429, 503)
+
+# client errors worth asking again for (timeout, too early, too many requests)
+TRANSIENT_CLIENT_STATUSES = (408, 425, 429)
+
+# same signature check as the structural validator (DocPdf._read)
+PDF_MAGIC = b"%PDF-"
+# content types that are never a PDF, whatever the URL says
+NON_PDF_TYPES = ("text/", "video/", "audio/", "image/", "application/json", "application/xml",
+                 "application/xhtml", "application/zip", "application/x-rar", "application/x-7z",
+                 "application/gzip", "application/x-tar", "application/vnd.")
+
+@dataclass
+class FetchResult:
+    """Outcome of a single download attempt."""
+    url: str
+    path: Optional[str] = None
+    status: Optional[int] = None        # HTTP status, if a response was received
+    retry_after: Optional[float] = None # seconds the host asked us to wait
+    error: Optional[str] = None
+    rejected: Optional[str] = None      # why the body was discarded while streaming
+    duplicate: bool = False             # content already stored, served from another URL
+    skipped: bool = False               # failed for good on a previous run, not attempted
+
+    @property
+    def throttled(self) -> bool:
+        return self.status in THROTTLE_STATUSES
+
+    @property
+    def host_failure(self) -> bool:
+        """Whether the failure says something about the host's health (not about the document)."""
+        if self.path or self.skipped:
+            return False
+        if self.status is None:
+            return self.error is not None # connection error, timeout...
+        return self.status >= 500 or self.throttled
 
 class DocDownloader:
     """Downloading of documents in a HTTP session."""
 
-    def __init__(self, config: Settings):
+    def __init__(self, config: Settings, pool_size: int = 10, host_aware: bool = False):
         self.config = config
+        self.pool_size = max(1, pool_size)
+        # when a scheduler paces hosts, throttling answers are handed back to it
+        # instead of sleeping on them inside a download worker
+        self.host_aware = host_aware
         self.session = self._init_session()
+        self._manifests: Dict[str, DownloadManifest] = {}
+        self._manifests_lock = threading.Lock()
+        # the same URL may appear in several records: never download it twice at once
+        self._url_locks = [threading.Lock() for _ in range(64)]
+        # files are added to (or dropped from) a download directory one at a time:
+        # a file is never dropped while another URL of the same contents is being recorded
+        self._store_lock = threading.Lock()
 
     def _init_session(self) -> requests.Session:
         """Configures a requests session with retry logic."""
-        retry_cfg = Retry(
-            total=5,
-            backoff_factor=0.5,
-            status_forcelist=[500, 502, 503, 504],
-            allowed_methods=["GET"],
-            raise_on_status=False,
-            respect_retry_after_header=True,
-        )
+        if self.host_aware:
+            retry_cfg = Retry(
+                total=2,
+                backoff_factor=0.5,
+                status_forcelist=[500, 502, 504],
+                allowed_methods=["GET"],
+                raise_on_status=False,
+                respect_retry_after_header=False,
+            )
+        else:
+            retry_cfg = Retry(
+                total=5,
+                backoff_factor=0.5,
+                status_forcelist=[500, 502, 503, 504],
+                allowed_methods=["GET"],
+                raise_on_status=False,
+                respect_retry_after_header=True,
+            )
         session = requests.Session()
-        adapter = HTTPAdapter(max_retries=retry_cfg)
+        # one pooled connection per concurrent download, so workers do not queue on the pool
+        adapter = HTTPAdapter(max_retries=retry_cfg, pool_connections=self.pool_size, pool_maxsize=self.pool_size)
         session.mount("https://", adapter)
         session.mount("http://", adapter)
         return session
@@ -39,44 +106,307 @@ class DocDownloader:
         Downloads a file from a URL to the output directory.
         (Like with metadata extraction) Skips download if file already exists.
         """
+        return self.download(url, output_dir, expected_type).path
+
+    def download(self, url: str, output_dir: str, expected_type: str) -> FetchResult:
+        """
+        Downloads a file from a URL to the output directory, reporting how the attempt went.
+        The download manifest of the directory makes reruns cost only the delta: stored files are
+        revalidated with conditional requests, interrupted bodies resume with Range requests and
+        URLs that failed for good are skipped.
+        """
         if not url:
+            return FetchResult(url=url, error="empty url")
+
+        with self._url_locks[hash(url) % len(self._url_locks)]:
+            local = self.lookup(url, output_dir, expected_type)
+            if local is not None:
+                return local
+            return self._download(url, output_dir, expected_type)
+
+    def lookup(self, url: str, output_dir: str, expected_type: str) -> Optional[FetchResult]:
+        """Answers a download from the manifest alone, if no request is needed (None otherwise)."""
+        if not url:
+            return FetchResult(url=url, error="empty url")
+
+        entry = self._manifest(output_dir).get(url)
+        if entry is None:
+            # file downloaded before there was a manifest
+            filename = self._get_filename(url, expected_type)
+            if not self.config.content_addressed_store and os.path.exists(os.path.join(output_dir, filename)):
+                print(f"    > Already downloaded: {filename}")
+                return FetchResult(url=url, path=os.path.join(output_dir, filename))
             return None
 
+        if entry["state"] == FAILED:
+            return FetchResult(url=url, error=f"previously failed ({entry['error_class']})", skipped=True)
+
+        if entry["state"] == DONE and entry["file"] and os.path.exists(os.path.join(output_dir, entry["file"])):
+            if self.config.download_revalidate and (entry["etag"] or entry["last_modified"]):
+                return None # worth a conditional request
+            print(f"    > Already downloaded: {entry['file']}")
+            return FetchResult(url=url, path=os.path.join(output_dir, entry["file"]))
+
+        return None
+
+    def _download(self, url: str, output_dir: str, expected_type: str) -> FetchResult:
+        manifest = self._manifest(output_dir)
+        entry = manifest.get(url) or {}
+        filename = self._get_filename(url, expected_type)
+        part_path = os.path.join(output_dir, f".{hashlib.sha1(url.encode('utf-8')).hexdigest()}.part")
+
+        stored_path = None
+        if entry.get("state") == DONE and entry.get("file") and os.path.exists(os.path.join(output_dir, entry["file"])):
+            stored_path = os.path.join(output_dir, entry["file"])
+        elif not self.config.content_addressed_store and os.path.exists(os.path.join(output_dir, filename)):
+            # stored by name: a file of that name (maybe another document) is never overwritten
+            print(f"    > Already downloaded: {filename}")
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            return FetchResult(url=url, path=os.path.join(output_dir, filename))
+
+        # conditional GET for stored files, Range GET for interrupted ones
+        headers = {}
+        offset = 0
+        validator = entry.get("etag") or entry.get("last_modified")
+        if stored_path:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        elif validator and os.path.exists(part_path):
+            offset = os.path.getsize(part_path)
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+                headers["If-Range"] = validator # only resume if the resource did not change
+
         try:
-            filename = self._get_filename(url, expected_type)
-            save_path = os.path.join(output_dir, filename)
+            with self.session.get(url, stream=True, timeout=20, headers=headers) as response:
+                if stored_path and response.status_code == 304:
+                    print(f"    > Unchanged: {entry['file']}")
+                    return FetchResult(url=url, path=stored_path, status=304)
 
-            # if already downloaded, pass
-            if os.path.exists(save_path):
-                print(f"    > Already downloaded: {filename}")
-                return save_path
+                if response.status_code in THROTTLE_STATUSES:
+                    retry_after = self._retry_after(response.headers.get("Retry-After"))
+                    print(f"    > Throttled ({response.status_code}): '{url}'")
+                    return FetchResult(url=url, status=response.status_code, retry_after=retry_after, error="throttled")
+
+                if response.status_code == 416 and offset:
+                    # nothing left past the partial body: finalised if it is the whole body, started over otherwise
+                    if entry.get("content_length") == offset:
+                        print(f"____> Already received: {filename}")
+                        return self._finalise(manifest, url, entry, output_dir, part_path, filename, expected_type,
+                                              self._hash_file(part_path), offset, response.status_code)
+                    print(f"    > Cannot resume at {offset} bytes, starting over: '{url}'")
+                    response.close()
+                    os.remove(part_path)
+                    return self._download(url, output_dir, expected_type)
 
-            # otherwise, download it off the internet
-            with self.session.get(url, stream=True, timeout=20) as response:
                 response.raise_for_status()
-                
-                print(f"____> Downloading: {filename}")
-                with open(save_path, 'wb') as fh:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            fh.write(chunk)
-            
-            return save_path
+
+                if response.status_code == 206 and not self._resumes_at(response, offset):
+                    # a range we did not ask for: drop the partial body, the next run starts over
+                    os.remove(part_path)
+                    raise requests.exceptions.RequestException(f"unexpected Content-Range resuming at {offset}")
+                if response.status_code != 206:
+                    offset = 0 # whole body (the server ignored the range, or the resource changed): start over
+
+                # reject on headers alone, before a single body byte is read
+                rejected = self._check_headers(response.headers, expected_type, offset)
+                if rejected:
+                    return self._reject(manifest, url, response.status_code, rejected, part_path)
+
+                content_length = response.headers.get("Content-Length")
+                manifest.started(
+                    url,
+                    content_length=offset + int(content_length) if content_length and content_length.isdigit() else None,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+
+                print(f"____> {'Resuming' if offset else 'Downloading'}: {filename}")
+                # the partial body is kept under a per-URL name, so that an interrupted
+                # download can be resumed by the next run
+                rejected, digest, size = self._stream(response, part_path, expected_type, offset)
+                if rejected:
+                    return self._reject(manifest, url, response.status_code, rejected, part_path)
+                return self._finalise(manifest, url, entry, output_dir, part_path, filename, expected_type, digest, size, response.status_code)
 
         except requests.exceptions.RequestException as e:
+            status = e.response.status_code if getattr(e, "response", None) is not None else None
+            if stored_path:
+                # could not revalidate, the stored copy is still good
+                print(f"    > Warning: could not revalidate '{url}' ({e}), keeping {entry['file']}")
+                return FetchResult(url=url, path=stored_path, status=status)
+
             print(f"    > Error: downloading '{url}': {e}")
+            error_class, permanent = self._classify(e, status)
+            received = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            manifest.failed(url, error_class, str(e), permanent=permanent, bytes_received=received)
+            return FetchResult(url=url, status=status, error=str(e))
+
         except Exception as e:
             print(f"    > Error: unexpected downloading '{url}': {e}")
-        
+            manifest.failed(url, type(e).__name__, str(e), permanent=False)
+            return FetchResult(url=url, error=str(e))
+
+    def _finalise(self, manifest: DownloadManifest, url: str, entry: dict, output_dir: str, part_path: str, filename: str,
+                  expected_type: str, digest: str, size: int, status: int) -> FetchResult:
+        """Moves a whole body from its partial file to its place in {output_dir}."""
+        duplicate = False
+        if self.config.content_addressed_store:
+            # stored under its content hash: the same document served
+            # from several URLs is only kept once
+            filename = shard_path(f"{digest}.{self._extension(expected_type)}", self.config.download_shard_depth)
+        save_path = os.path.join(output_dir, filename)
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        with self._store_lock:
+            if self.config.content_addressed_store and os.path.exists(save_path):
+                duplicate = filename != entry.get("file")
+                os.remove(part_path)
+            elif not self.config.content_addressed_store and filename != entry.get("file"):
+                # stored by name: the name is claimed first, so that two documents of the same name
+                # (e.g. downloaded at once by two threads) never overwrite each other
+                try:
+                    open(save_path, "xb").close()
+                except FileExistsError:
+                    os.remove(part_path)
+                    print(f"    > Already downloaded: {filename}")
+                    return FetchResult(url=url, path=save_path, status=status)
+                os.replace(part_path, save_path)
+            else:
+                os.replace(part_path, save_path)
+            manifest.done(url, digest, size, filename)
+            self._drop_replaced(manifest, output_dir, entry.get("file"), filename)
+
+        if duplicate:
+            print(f"    > Duplicate of {filename}: '{url}'")
+        return FetchResult(url=url, path=save_path, status=status, duplicate=duplicate)
+
+    def _drop_replaced(self, manifest: DownloadManifest, output_dir: str, previous: Optional[str], filename: str) -> None:
+        """Removes the file a URL was stored under before its contents changed, once no URL of the manifest refers to it."""
+        if not self.config.content_addressed_store or not previous or previous == filename or manifest.references(previous):
+            return
+        path = os.path.join(output_dir, previous)
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"    > Changed: {previous} replaced by {filename}")
+
+    @staticmethod
+    def _hash_file(path: str) -> str:
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                hasher.update(block)
+        return hasher.hexdigest()
+
+    def _check_headers(self, headers, expected_type: str, offset: int = 0) -> Optional[str]:
+        """Rejects a response from its Content-Type/Content-Length headers."""
+        content_type = (headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if expected_type == "application/pdf" and content_type.startswith(NON_PDF_TYPES):
+            return f"content_type: {content_type}"
+
+        content_length = headers.get("Content-Length")
+        if content_length and content_length.isdigit() and offset + int(content_length) > self.config.download_max_bytes:
+            return f"too_large: {offset + int(content_length)} bytes"
         return None
 
+    def _stream(self, response: requests.Response, path: str, expected_type: str, offset: int = 0) -> Tuple[Optional[str], str, int]:
+        """
+        Streams the body into {path} (appending to its first {offset} bytes when resuming),
+        aborting as soon as it turns out not to be worth keeping:
+        a body not starting with the PDF signature, or one growing past the size cap.
+        Returns the rejection reason (if any), the SHA-256 of the whole file and its size.
+        """
+        max_bytes = self.config.download_max_bytes
+        check_magic = expected_type == "application/pdf" and offset == 0
+        received = offset
+        head = b""
+        hasher = hashlib.sha256()
+
+        if offset:
+            # the hash covers the bytes received by the interrupted run too
+            with open(path, 'rb') as fh:
+                for block in iter(lambda: fh.read(1 << 20), b""):
+                    hasher.update(block)
+
+        with open(path, 'ab' if offset else 'wb') as fh:
+            for chunk in response.iter_content(chunk_size=8192):
+                if not chunk:
+                    continue
+                received += len(chunk)
+                if received > max_bytes:
+                    return f"too_large: over {max_bytes} bytes", "", received
+
+                if check_magic:
+                    head += chunk[:len(PDF_MAGIC)]
+                    if len(head) >= len(PDF_MAGIC):
+                        if not head.startswith(PDF_MAGIC):
+                            return "signature: not a PDF", "", received
+                        check_magic = False
+                hasher.update(chunk)
+                fh.write(chunk)
+
+        if check_magic:
+            return "signature: body too short", "", received
+        return None, hasher.hexdigest(), received
+
+    def _manifest(self, output_dir: str) -> DownloadManifest:
+        """Manifest of the content-addressed store in {output_dir}, loaded once."""
+        with self._manifests_lock:
+            if output_dir not in self._manifests:
+                self._manifests[output_dir] = DownloadManifest(output_dir)
+            return self._manifests[output_dir]
+
+    def _reject(self, manifest: DownloadManifest, url: str, status: int, reason: str, part_path: str) -> FetchResult:
+        print(f"    > Rejected '{url}': {reason}")
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        rejected = reason.split(":")[0]
+        manifest.failed(url, rejected, reason, permanent=True)
+        return FetchResult(url=url, status=status, error=reason, rejected=rejected)
+
+    def _resumes_at(self, response: requests.Response, offset: int) -> bool:
+        """Whether a 206 answer continues the body exactly where the partial file ends."""
+        content_range = response.headers.get("Content-Range", "") # bytes {start}-{end}/{total}
+        try:
+            return offset > 0 and int(content_range.split()[1].split("-")[0]) == offset
+        except (IndexError, ValueError):
+            return False
+
+    def _classify(self, error: Exception, status: Optional[int]) -> Tuple[str, bool]:
+        """Error class of a failed download, and whether it is permanent."""
+        if status is not None:
+            permanent = 400 <= status < 500 and status not in TRANSIENT_CLIENT_STATUSES
+            return f"http_{status}", permanent
+        return type(error).__name__, False # timeouts, connection errors... worth retrying
+
+    def _retry_after(self, value: Optional[str]) -> Optional[float]:
+        """Parses a Retry-After header, given either in seconds or as an HTTP date."""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+            if when.tzinfo is None:
+                when = when.replace(tzinfo=timezone.utc)
+            return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def _extension(self, load_type: str) -> str:
+        # default extension, none (but we expect PDF for now?)
+        return load_type.split("/")[-1] if "/" in load_type else "bin"
+
     def _get_filename(self, url: str, load_type: str) -> str:
         """Gets a valid filename for a given document's URL."""
         parsed = urlparse(url)
         raw_name = os.path.basename(parsed.path)
-        
-        # default extension, none (but we expect PDF for now?)
-        ext = load_type.split("/")[-1] if "/" in load_type else "bin"
+
+        ext = self._extension(load_type)
 
         if not raw_name:
             safe_url = url.replace("https://", "").replace("http://", "").replace("/", "_")
@@ -89,5 +419,5 @@ class DocDownloader:
         # use a hash for the name just in case
         if not filename:
             filename = f"file_{hash(url) & 0xfffffff}.{ext}"
-            
-        return filename
\ No newline at end of file
+
+        return filename
@@ -4,69 +4,183 @@
 # jan-2026
 
 import os
+import json
+import time
+import itertools
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterable, Iterator, Dict, Any
 from tqdm import tqdm
 from ...config.settings import Settings
-from .downloader import DocDownloader
-from .utils import load_json
+from .downloader import DocDownloader, FetchResult
+from .scheduler import HostScheduler
+from .utils import iter_records
+
+# log of URLs whose body was discarded while downloading, and why
+REJECTIONS_FILE = "rejected.jsonl"
 
 class DocLoader:
     """Batch loader of documents from a file with the URLs of these files."""
 
-    def __init__(self, config: Settings):
+    def __init__(self, config: Settings, concurrency: int = None):
         self.config = config
-        self.downloader = DocDownloader(config)
+        self.concurrency = max(1, concurrency if concurrency is not None else config.download_concurrency)
+        self.downloader = DocDownloader(config, pool_size=self.concurrency, host_aware=self.concurrency > 1)
+        self.rejections = Counter()
+        self.duplicates = 0
 
     def load_batch(self, input_file: str, output_dir: str, n: int = None, load_type: str = "application/pdf") -> None:
-        """Loads {n} documents from the URLs on a JSON file into the output directory."""
+        """Loads {n} documents from the URLs on a JSON (array) or JSONL file into the output directory."""
         os.makedirs(output_dir, exist_ok=True)
 
-        ko_data = load_json(input_file)
-        if not ko_data:
+        # records are streamed off the catalogue: downloads start right away,
+        # and memory does not depend on the size of the catalogue
+        ko_data = iter_records(input_file)
+        first = next(ko_data, None)
+        if first is None:
             print("    > Warning: No KO data found.")
             return
+        ko_data = itertools.chain([first], ko_data)
 
         max_load = n if (isinstance(n, int) and n > 0) else None
-        loaded_count = 0
-        
-        total = max_load if max_load else len(ko_data)
-        pbar = tqdm(total=total, unit="file", ncols=80, disable=False) # progress bar!
 
-        for record in ko_data:
-            if max_load is not None and loaded_count >= max_load:
-                break
+        # without a limit, the number of documents is unknown until the catalogue is read
+        pbar = tqdm(total=max_load, unit="file", ncols=80, disable=False) # progress bar!
+
+        urls = self._iter_urls(ko_data, load_type)
+        if self.concurrency > 1:
+            self._load_concurrent(urls, output_dir, load_type, max_load, pbar)
+        else:
+            self._load_sequential(urls, output_dir, load_type, max_load, pbar)
+
+        pbar.close()
+
+        if self.duplicates:
+            print(f"    > {self.duplicates} URLs served documents that were already stored")
+        if self.rejections:
+            summary = ", ".join(f"{reason}: {count}" for reason, count in self.rejections.most_common())
+            print(f"    > Rejected while streaming ({summary}), see {os.path.join(output_dir, REJECTIONS_FILE)}")
+
+    # ---------------------------------------------------------------------------------------
 
+    def _iter_urls(self, ko_data: Iterable[Dict[str, Any]], load_type: str) -> Iterator[str]:
+        """Yields every downloadable URL of every record, in catalogue order."""
+        for record in ko_data:
             processed_urls = set()
 
             # main @id
             # "@id": "URL"
             main_url = record.get("@id")
-            if self._process_url(main_url, processed_urls, output_dir, load_type):
-                loaded_count += 1
-                pbar.update(1)
-
-            # keep it under the maximum
-            if max_load is not None and loaded_count >= max_load:
-                break
+            if main_url:
+                processed_urls.add(main_url)
+                yield main_url
 
             # "doc_resources": [{
             # "@id": "URL",
             for res in record.get("doc_resources", []):
-                if max_load is not None and loaded_count >= max_load:
-                    break
-
                 res_url = res.get("@id")
                 mime_type = res.get("display_metadata", {}).get("hosted_mime_type")
                 if (not mime_type or mime_type == load_type):
-                    if self._process_url(res_url, processed_urls, output_dir, load_type):
+                    if res_url and res_url not in processed_urls:
+                        processed_urls.add(res_url)
+                        yield res_url
+
+    def _load_sequential(self, urls: Iterator[str], dest: str, type_filter: str, max_load: int, pbar: tqdm) -> int:
+        """Downloads one URL at a time until {max_load} documents are loaded."""
+        loaded_count = 0
+        for url in urls:
+            # keep it under the maximum
+            if max_load is not None and loaded_count >= max_load:
+                break
+            result = self.downloader.download(url, dest, type_filter)
+            self._record(result, dest)
+            if result.path and not result.duplicate:
+                loaded_count += 1
+                pbar.update(1)
+        return loaded_count
+
+    def _load_concurrent(self, urls: Iterator[str], dest: str, type_filter: str, max_load: int, pbar: tqdm) -> int:
+        """
+        Downloads up to {concurrency} URLs at a time until {max_load} documents are loaded.
+        URLs are read ahead into a host-aware scheduler, so a slow or throttling host only
+        holds its own downloads back while the other hosts keep the pool busy.
+        Never keeps more downloads in flight than could still count towards the limit,
+        so the limit is never exceeded; downloads are counted as soon as they complete.
+        """
+        scheduler = HostScheduler(
+            rate=self.config.download_host_rate,
+            burst=self.config.download_host_burst,
+            max_per_host=self.config.download_host_connections,
+            breaker_threshold=self.config.download_breaker_threshold,
+            max_deferred=self.config.download_lookahead,
+        )
+        loaded_count = 0
+        in_flight = set()
+        exhausted = False
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="download") as pool:
+            while True:
+                # read ahead, so that there are URLs of several hosts to choose from
+                # (URLs the manifest already answers for never wait on a host; those of tripped hosts are bounded apart, see HostScheduler)
+                while not exhausted and scheduler.pending_healthy() < self.config.download_lookahead:
+                    if max_load is not None and loaded_count + len(in_flight) >= max_load:
+                        break
+                    url = next(urls, None)
+                    if url is None:
+                        exhausted = True
+                        break
+                    local = self.downloader.lookup(url, dest, type_filter)
+                    if local is None:
+                        scheduler.add(url)
+                    elif local.path and not local.duplicate:
                         loaded_count += 1
                         pbar.update(1)
 
-        pbar.close()
+                # top up the pool
+                while len(in_flight) < self.concurrency:
+                    if max_load is not None and loaded_count + len(in_flight) >= max_load:
+                        break
+                    url = scheduler.next_url()
+                    if url is None:
+                        break
+                    in_flight.add(pool.submit(self.downloader.download, url, dest, type_filter))
+
+                limit_reached = max_load is not None and loaded_count >= max_load
+                # the pacing of the hosts only matters if another download could be submitted:
+                # otherwise, wait for one to complete (no timeout, no busy loop)
+                can_submit = len(in_flight) < self.concurrency and not (
+                    max_load is not None and loaded_count + len(in_flight) >= max_load)
+                wait_s = scheduler.next_ready_in() if can_submit else None
+
+                if not in_flight:
+                    if limit_reached or (wait_s is None and exhausted):
+                        break
+                    if wait_s is not None:
+                        time.sleep(wait_s) # every pending host is paced or backing off
+                    continue
 
-    def _process_url(self, url: str, history: set, dest: str, type_filter: str) -> bool:
-        """Downloads document off an URL based on supported file type and whether already downloaded."""
-        if url and url not in history:
-            if self.downloader.fetch(url, dest, type_filter):
-                history.add(url)
-                return True
-        return False
\ No newline at end of file
+                done, in_flight = wait(in_flight, timeout=wait_s, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    scheduler.done(result)
+                    self._record(result, dest)
+                    if result.path and not result.duplicate:
+                        loaded_count += 1
+                        pbar.update(1)
+
+        if scheduler.tripped_hosts():
+            print(f"    > Warning: deferred failing hosts: {', '.join(scheduler.tripped_hosts())}")
+        if scheduler.dropped:
+            print(f"    > Warning: gave up on {scheduler.dropped} URLs of failing hosts (tried again on the next run)")
+
+        return loaded_count
+
+    def _record(self, result: FetchResult, dest: str) -> None:
+        """Keeps track of duplicates, and of why a URL was rejected, if it was."""
+        if result.duplicate:
+            self.duplicates += 1
+        if not result.rejected:
+            return
+        self.rejections[result.rejected] += 1
+        with open(os.path.join(dest, REJECTIONS_FILE), "a", encoding="utf-8") as f:
+            f.write(json.dumps({"url": result.url, "reason": result.error}, ensure_ascii=False) + "\n")
@@ -0,0 +1,108 @@
+# manifest.py
+# /persistent per-URL download manifest (SQLite)/
+# adriana r.f.
+# feb-2026
+
+import os
+import time
+import sqlite3
+from pathlib import Path
+from threading import Lock
+from typing import Optional, Dict, List, Any
+
+MANIFEST_FILE = "manifest.sqlite"
+
+# download states
+PARTIAL = "partial" # body partly on disk, can be resumed
+DONE = "done"
+ERROR = "error"     # transient failure (timeout, 5xx...), retried on the next run
+FAILED = "failed"   # permanent failure (404, not a PDF...), skipped on the next runs
+
+COLUMNS = ("url", "state", "bytes_received", "content_length", "etag", "last_modified",
+           "sha256", "file", "error_class", "error", "attempts", "updated_at")
+
+class DownloadManifest:
+    """
+    Persistent record of every URL of a download directory: its state, how many bytes were
+    received, the validators needed to resume or revalidate it (ETag/Last-Modified), the file
+    (and content hash) it yielded and, if it failed, why.
+    A {read_only} manifest (e.g. to find the sources of the documents while they are processed) is only queried.
+    """
+
+    def __init__(self, output_dir: str, read_only: bool = False):
+        self.output_dir = str(output_dir)
+        self.path = os.path.join(output_dir, MANIFEST_FILE)
+        self._lock = Lock()
+        if read_only:
+            # (a missing manifest is an error, not a new empty one: see exists)
+            self._conn = sqlite3.connect(f"{Path(self.path).resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+            return
+        # shared by the download threads, serialized by the lock
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL") # one small commit per URL
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS downloads ("
+            "url TEXT PRIMARY KEY, state TEXT NOT NULL, bytes_received INTEGER DEFAULT 0, "
+            "content_length INTEGER, etag TEXT, last_modified TEXT, sha256 TEXT, file TEXT, "
+            "error_class TEXT, error TEXT, attempts INTEGER DEFAULT 0, updated_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS downloads_file ON downloads (file)")
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Manifest entry of a URL, if it was ever attempted."""
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(COLUMNS)} FROM downloads WHERE url = ?", (url,)).fetchone()
+        return dict(zip(COLUMNS, row)) if row else None
+
+    def started(self, url: str, content_length: Optional[int], etag: Optional[str], last_modified: Optional[str]) -> None:
+        """A body started streaming: keeps the validators needed to resume it."""
+        self._upsert(url, state=PARTIAL, content_length=content_length, etag=etag,
+                     last_modified=last_modified, error_class=None, error=None)
+
+    def done(self, url: str, sha256: str, size: int, filename: str) -> None:
+        self._upsert(url, state=DONE, bytes_received=size, sha256=sha256, file=filename,
+                     error_class=None, error=None)
+
+    def failed(self, url: str, error_class: str, error: str, permanent: bool, bytes_received: int = 0) -> None:
+        self._upsert(url, state=FAILED if permanent else ERROR, error_class=error_class,
+                     error=error, bytes_received=bytes_received)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def sources(self, file_path: str) -> List[str]:
+        """URLs a stored file (path within the download directory) was served from, looked up through the index on file."""
+        filename = os.path.relpath(file_path, self.output_dir)
+        with self._lock:
+            rows = self._conn.execute("SELECT url FROM downloads WHERE file = ? AND state = ? ORDER BY rowid", (filename, DONE)).fetchall()
+        return [url for (url,) in rows]
+
+    def references(self, filename: str) -> int:
+        """How many URLs refer to a stored file (path within the download directory), whatever their state."""
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM downloads WHERE file = ?", (filename,)).fetchone()
+        return count
+
+    @staticmethod
+    def exists(output_dir: str) -> bool:
+        return os.path.exists(os.path.join(output_dir, MANIFEST_FILE))
+
+    # ---------------------------------------------------------------------------------------
+
+    def _upsert(self, url: str, **fields) -> None:
+        fields["updated_at"] = time.time()
+        # an attempt is counted once it is over (done or failed), not when it starts
+        fields["attempts"] = 0 if fields["state"] == PARTIAL else 1
+        names = ", ".join(fields)
+        placeholders = ", ".join("?" for _ in fields)
+        updates = ", ".join(f"{name} = excluded.{name}" for name in fields if name != "attempts")
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO downloads (url, {names}) VALUES (?, {placeholders}) "
+                f"ON CONFLICT(url) DO UPDATE SET {updates}, attempts = downloads.attempts + excluded.attempts",
+                (url, *fields.values()),
+            )
+            self._conn.commit()
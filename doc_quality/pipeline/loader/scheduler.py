@@ -0,0 +1,155 @@
+# scheduler.py
+# /host-aware scheduling of downloads (per-domain rate limits + circuit breakers)/
+# adriana r.f.
+# feb-2026
+
+import time
+from collections import deque, OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Deque, List
+from urllib.parse import urlparse
+from .downloader import FetchResult
+
+@dataclass
+class _HostState:
+    """Pacing and health of a single host."""
+    tokens: float
+    refilled_at: float
+    queue: Deque[str] = field(default_factory=deque)
+    active: int = 0
+    blocked_until: float = 0.0  # Retry-After / backoff
+    failures: int = 0           # consecutive host failures
+    tripped: bool = False       # circuit breaker open: deferred to the end of the batch
+
+class HostScheduler:
+    """
+    Groups URLs by host and hands out the next URL that may be downloaded right now.
+    Each host gets its own token bucket (rate limit) and connection cap, throttling answers
+    block the host for as long as it asked for (Retry-After), and a host that keeps failing
+    trips a circuit breaker: its URLs are deferred until every healthy host has been drained,
+    and then retried one at a time. At most {max_deferred} URLs are held for tripped hosts:
+    any other URL of theirs is given up on (not recorded anywhere, so the next run tries it again).
+    """
+
+    def __init__(self, rate: float, burst: int, max_per_host: int, breaker_threshold: int, max_retries: int = 3, backoff: float = 5.0,
+                 max_deferred: int = 2000):
+        self.rate = max(rate, 1e-6) # tokens (requests) per second, per host
+        self.burst = max(1, burst)
+        self.max_per_host = max(1, max_per_host)
+        self.breaker_threshold = max(1, breaker_threshold)
+        self.max_retries = max_retries
+        self.backoff = backoff      # default wait when a host throttles without Retry-After
+        self.max_deferred = max(0, max_deferred)
+
+        self.hosts: Dict[str, _HostState] = OrderedDict()
+        self.retries: Dict[str, int] = {}
+        self.dropped = 0 # URLs given up on (host still failing once deferred, or too many deferred)
+
+    # ---------------------------------------------------------------------------------------
+
+    def add(self, url: str) -> None:
+        """Queues a URL under its host (unless its host is tripped and enough URLs are deferred already)."""
+        host = self._host(self._key(url))
+        if host.tripped and self.pending_deferred() >= self.max_deferred:
+            self.dropped += 1
+            return
+        host.queue.append(url)
+
+    def pending_healthy(self) -> int:
+        """URLs waiting on hosts whose circuit breaker is closed."""
+        return sum(len(h.queue) for h in self.hosts.values() if not h.tripped)
+
+    def pending_deferred(self) -> int:
+        """URLs waiting on hosts whose circuit breaker is open."""
+        return sum(len(h.queue) for h in self.hosts.values() if h.tripped)
+
+    def tripped_hosts(self) -> List[str]:
+        return [key for key, h in self.hosts.items() if h.tripped]
+
+    def next_url(self, now: float = None) -> Optional[str]:
+        """Returns a URL that can be downloaded right now, or None if every host must wait."""
+        now = time.monotonic() if now is None else now
+        for key in self._eligible():
+            host = self.hosts[key]
+            if self._ready(host, now):
+                host.tokens -= 1
+                host.active += 1
+                # round-robin: this host goes to the back of the line
+                self.hosts.move_to_end(key)
+                return host.queue.popleft()
+        return None
+
+    def next_ready_in(self, now: float = None) -> Optional[float]:
+        """Seconds until some host may be served again (None if nothing is waiting on a timer)."""
+        now = time.monotonic() if now is None else now
+        waits = []
+        for key in self._eligible():
+            host = self.hosts[key]
+            if not host.queue or host.active >= self._cap(host):
+                continue
+            self._refill(host, now)
+            token_wait = (1 - host.tokens) / self.rate + 1e-3 if host.tokens < 1 else 0.0
+            waits.append(max(host.blocked_until - now, token_wait, 0.0))
+        return min(waits) if waits else None
+
+    def done(self, result: FetchResult, now: float = None) -> None:
+        """Updates the host's health and pacing with the outcome of one of its downloads."""
+        now = time.monotonic() if now is None else now
+        key = self._key(result.url)
+        host = self._host(key)
+        host.active = max(0, host.active - 1)
+
+        if not result.host_failure:
+            host.failures = 0
+            host.tripped = False # a deferred host that answers again is healthy again
+            return
+
+        host.failures += 1
+
+        if result.throttled:
+            # honour Retry-After (or back off) and give the URL another go
+            wait = result.retry_after if result.retry_after is not None else self.backoff * host.failures
+            host.blocked_until = max(host.blocked_until, now + wait)
+            retries = self.retries.get(result.url, 0)
+            if retries < self.max_retries:
+                self.retries[result.url] = retries + 1
+                host.queue.appendleft(result.url)
+
+        if host.failures >= self.breaker_threshold:
+            if host.tripped:
+                # already deferred and still failing: give up on what is left
+                self.dropped += len(host.queue)
+                host.queue.clear()
+            else:
+                print(f"    > Warning: host '{key}' keeps failing, deferring its downloads to the end")
+                host.tripped = True
+                host.failures = 0
+
+    # ---------------------------------------------------------------------------------------
+
+    def _key(self, url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def _host(self, key: str) -> _HostState:
+        if key not in self.hosts:
+            self.hosts[key] = _HostState(tokens=float(self.burst), refilled_at=time.monotonic())
+        return self.hosts[key]
+
+    def _eligible(self) -> List[str]:
+        """Hosts that may be served: tripped hosts only get a turn once healthy hosts have nothing left."""
+        healthy_left = any(h.queue or h.active for h in self.hosts.values() if not h.tripped)
+        return [key for key, h in self.hosts.items() if not (h.tripped and healthy_left)]
+
+    def _cap(self, host: _HostState) -> int:
+        # a deferred host is probed with a single connection
+        return 1 if host.tripped else self.max_per_host
+
+    def _refill(self, host: _HostState, now: float) -> None:
+        host.tokens = min(self.burst, host.tokens + (now - host.refilled_at) * self.rate)
+        host.refilled_at = now
+
+    def _ready(self, host: _HostState, now: float) -> bool:
+        if not host.queue or host.active >= self._cap(host) or now < host.blocked_until:
+            return False
+        self._refill(host, now)
+        return host.tokens >= 1
@@ -3,22 +3,110 @@
 # adriana r.f.
 # jan-2026
 
+import os
 import json
-from typing import Optional, List, Dict, Any
+from typing import Dict, Any, Iterator
 
-def load_json(file_path: str) -> Optional[List[Dict[str, Any]]]:
-    """Loads data structure from a JSON file."""
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+
+def iter_records(file_path: str, chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the records of a JSON file one at a time, without ever loading the whole file:
+    either a top-level JSON array of records, or a JSONL file (one record per line).
+    Raises ValueError for any other top-level JSON value (e.g. a single object spread over several lines).
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            if not isinstance(data, list):
-                print(f"> Error: Invalid JSON content in file: {file_path}")
-                return None
-            return data
+        # (utf-8-sig: a BOM left by some editors is dropped)
+        with open(file_path, 'r', encoding='utf-8-sig') as f:
+            head = f.read(chunk_size)
+            if file_path.lower().endswith(JSONL_EXTENSIONS):
+                yield from _iter_lines(f, head, file_path)
+            elif head.lstrip().startswith("["):
+                yield from _iter_array(f, head, chunk_size, file_path)
+            elif not head.strip() or _is_jsonl(head):
+                # records one per line, under a .json name
+                yield from _iter_lines(f, head, file_path)
+            else:
+                raise ValueError(f"{file_path}: the top-level JSON value is not an array of records (nor one record per line)")
 
     except FileNotFoundError:
         print(f"    > Error: JSON file not found: {file_path}")
+
+def _is_jsonl(head: str) -> bool:
+    """Whether a file starts with a whole JSON object on its first (non-empty) line."""
+    first, newline, _ = head.lstrip().partition("\n")
+    if not newline:
+        # a single line, maybe longer than the head read
+        return first.startswith("{")
+    try:
+        return isinstance(json.loads(first), dict)
     except json.JSONDecodeError:
-        print(f"    > Error: Invalid JSON format: {file_path}")
+        return False
+
+def _iter_array(f, buf: str, chunk_size: int, file_path: str) -> Iterator[Dict[str, Any]]:
+    """Incrementally decodes the elements of a top-level JSON array."""
+    decoder = json.JSONDecoder()
+    pos = buf.index("[") + 1
+    eof = False
+    expect_value = True # right after '[' or ','
+
+    while True:
+        # skip separators
+        while pos < len(buf) and (buf[pos].isspace() or (buf[pos] == "," and not expect_value)):
+            if buf[pos] == ",":
+                expect_value = True
+            pos += 1
+
+        if pos < len(buf) and buf[pos] == "]":
+            return
+
+        if pos < len(buf):
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+                # a value touching the end of the buffer may continue in the next chunk (e.g. numbers)
+                if end < len(buf) or eof:
+                    if isinstance(obj, dict):
+                        yield obj
+                    pos, expect_value = end, False
+                    continue
+            except json.JSONDecodeError:
+                if eof:
+                    print(f"    > Error: Invalid JSON format: {file_path}")
+                    return
 
-    return None
\ No newline at end of file
+        if eof:
+            print(f"    > Error: Invalid JSON format (unterminated array): {file_path}")
+            return
+
+        # need more data: drop what was already consumed
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+def _iter_lines(f, head: str, file_path: str) -> Iterator[Dict[str, Any]]:
+    """Decodes a JSONL file, one record per line."""
+    pending = ""
+    for block in _chain_head(head, f):
+        lines = (pending + block).split("\n")
+        pending = lines.pop() # possibly incomplete last line
+        for line in lines:
+            yield from _decode_line(line, file_path)
+    yield from _decode_line(pending, file_path)
+
+def _chain_head(head: str, f) -> Iterator[str]:
+    yield head
+    for block in iter(lambda: f.read(1 << 16), ""):
+        yield block
+
+def _decode_line(line: str, file_path: str) -> Iterator[Dict[str, Any]]:
+    line = line.strip()
+    if not line:
+        return
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError:
+        print(f"    > Warning: skipping invalid JSON line in {os.path.basename(file_path)}: {line[:80]}")
+        return
+    if isinstance(record, dict):
+        yield record
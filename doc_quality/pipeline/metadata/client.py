@@ -3,59 +3,261 @@
 # adriana r.f.
 # jan-2026
 
+import io
 import os
+import gzip
 import json
+import hashlib
+import time
+import random
+import asyncio
+import threading
 import requests
-from typing import IO
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import IO, Dict, Optional, Tuple
 from pathlib import Path
+from requests.adapters import HTTPAdapter
 from ...config.settings import Settings
+from ..quality.cache import ResultCache
+from ..quality.doc_types.textcache import TextCache
+
+# answers worth asking again (overloaded or restarting endpoint)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class PromptCache:
+    """Prompt text, read again only when its file changes (modification time or size)."""
+
+    def __init__(self):
+        self._prompts: Dict[str, Tuple[tuple, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path) -> str:
+        path = str(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return ""
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._prompts.get(path)
+            if cached is None or cached[0] != stamp:
+                cached = (stamp, Path(path).read_text(encoding="utf-8"))
+                self._prompts[path] = cached
+        return cached[1]
+
+_PROMPTS = PromptCache()
 
 class DocMetadataClient:
-    """Metadata extraction for a (structurally-valid) document."""
-    
+    """
+    Metadata extraction for a (structurally-valid) document.
+    Requests go through a pooled HTTP session (keep-alive), at most {max_in_flight} at once,
+    and are retried with jittered exponential backoff on connection errors and overloaded answers.
+    Responses are cached by document contents, for a given prompt text and endpoint: a document is
+    only posted again if any of them changed.
+    """
+
+    _shared: Dict[str, "DocMetadataClient"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, config: Settings, max_in_flight: Optional[int] = None):
+        self.config = config
+        self.max_in_flight = max(1, max_in_flight or config.metadata_concurrency)
+        self.session = self._init_session()
+        self._slots = threading.Semaphore(self.max_in_flight) # (released beyond its start value when grown, see shared)
+        self.cache = None
+        if config.metadata_cache:
+            self.cache = ResultCache(str(config.metadata_cache_dir), capacity=config.result_cache_size)
+
     @classmethod
-    def extract(cls, file: IO, config: Settings, filename: str = None) -> dict:
-        """Streams a file to the external metadata extraction endpoint."""
-        file.seek(0)
-        
+    def shared(cls, config: Settings, max_in_flight: Optional[int] = None) -> "DocMetadataClient":
+        """
+        Client of this process for the configured endpoint (created once, then reused),
+        grown in place if more requests in flight ({max_in_flight}, default: metadata_concurrency) are asked for.
+        """
+        max_in_flight = max(1, max_in_flight or config.metadata_concurrency)
+        with cls._shared_lock:
+            client = cls._shared.get(config.extraction_endpoint)
+            if client is None:
+                client = cls._shared[config.extraction_endpoint] = cls(config, max_in_flight)
+            elif client.max_in_flight < max_in_flight:
+                client._grow(max_in_flight)
+        return client
+
+    @classmethod
+    def extract(cls, file: IO, config: Settings, filename: str = None, content_hash: str = None,
+                excerpt: Optional[str] = None, payload: Optional[dict] = None) -> dict:
+        """Streams a file to the external metadata extraction endpoint (through the shared client)."""
+        return cls.shared(config).request(file, filename, content_hash, excerpt, payload)
+
+    def request(self, file: IO, filename: str = None, content_hash: str = None,
+                excerpt: Optional[str] = None, payload: Optional[dict] = None) -> dict:
+        """
+        Posts a file to the extraction endpoint, waiting for a free slot if {max_in_flight} are already out.
+        With an {excerpt} (see DocPdf._excerpt), only that text is sent instead of the whole file (gzipped if metadata_excerpt_gzip).
+        Answered from the cache if this document was already extracted with the same prompt, endpoint and payload mode
+        ({content_hash}: hash of the file contents, if already known).
+        Bytes of the file and bytes actually sent are recorded in {payload}, if given.
+        """
         response_base = {}
+        prompt = _PROMPTS.get(self.config.prompt_path)
 
-        try:
-            dummy = "polloconpatatas.pdf"
-            files = {"file": (dummy, file, "application/pdf")}
+        key = version = None
+        if self.cache is not None:
+            key = content_hash or TextCache.key(file)
+            version = self._version(prompt, excerpt is not None)
+            cached = self.cache.get(key, version)
+            if cached is not None:
+                return cached
 
-            if os.path.exists(config.prompt_path):
-                prompt = Path(config.prompt_path).read_text(encoding="utf-8")
+        try:
+            if excerpt is None:
+                dummy = "polloconpatatas.pdf"
+                files = {"file": (dummy, file, "application/pdf")}
+                body = file
             else:
-                prompt = "" 
-
+                files, body = self._excerpt_files(excerpt)
             data = {"prompt": prompt}
-            
+            if payload is not None:
+                payload["file"] = self._size(file)
+                payload["sent"] = self._size(body)
+
             headers = {}
-            if hasattr(config, "api_key") and config.api_key:
-                headers["Authorization"] = f"Bearer {config.api_key}"
-                        
-            api_resp = requests.post(
-                config.extraction_endpoint,
-                headers=headers,
-                files=files, 
-                data=data, 
-                timeout=60
-            )
+            if hasattr(self.config, "api_key") and self.config.api_key:
+                headers["Authorization"] = f"Bearer {self.config.api_key}"
+
+            with self._slots:
+                api_resp = self._post(files, body, data, headers)
             api_resp.raise_for_status()
-            
-            result = api_resp.json()
-            
-            return {**response_base, **result}
+
+            result = {**response_base, **api_resp.json()}
+            if self.cache is not None:
+                self.cache.put(key, version, result)
+
+            return result
 
         except requests.exceptions.RequestException as e:
             print(f"    (!) > Error extracting metadata: {e}")
             return {**response_base, "diagnostics": {"error": "endpoint connection failed"}}
-            
+
         except json.JSONDecodeError:
             print(f"    (!) > Error decoding metadata JSON response")
             return {**response_base, "diagnostics": {"error": "invalid json response"}}
-            
+
         except Exception as e:
             print(f"    (!) > Unexpected error: {e}")
-            return {**response_base, "diagnostics": {"error": f"unknown metadata extraction error ({e})"}}
\ No newline at end of file
+            return {**response_base, "diagnostics": {"error": f"unknown metadata extraction error ({e})"}}
+
+    def close(self) -> None:
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    # ---------------------------------------------------------------------------------------
+
+    def _grow(self, max_in_flight: int) -> None:
+        """
+        Allows {max_in_flight} requests at once (more than now): as many more slots, and a session with a pool as big.
+        The previous session is closed: its idle connections now, those of the requests still in flight when given back.
+        """
+        previous = self.session
+        self.max_in_flight, extra = max_in_flight, max_in_flight - self.max_in_flight
+        self.session = self._init_session()
+        previous.close()
+        self._slots.release(extra)
+
+    def _init_session(self) -> requests.Session:
+        """Session with one pooled (keep-alive) connection per request in flight. Retries are handled in _post."""
+        session = requests.Session()
+        adapter = HTTPAdapter(max_retries=0, pool_connections=1, pool_maxsize=self.max_in_flight, pool_block=True)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _version(self, prompt: str, excerpt: bool = False) -> str:
+        """What a response depends on besides the document: prompt text, endpoint identity and what is sent of the document."""
+        sent = f"excerpt-{self.config.metadata_excerpt_tokens}" if excerpt else "pdf"
+        return hashlib.sha256(json.dumps([prompt, self.config.extraction_endpoint, sent]).encode("utf-8")).hexdigest()
+
+    def _excerpt_files(self, excerpt: str) -> Tuple[dict, IO]:
+        """Multipart file of an excerpt (plain or gzipped text) and its body."""
+        data = excerpt.encode("utf-8")
+        if self.config.metadata_excerpt_gzip:
+            body = io.BytesIO(gzip.compress(data))
+            return {"file": ("excerpt.txt.gz", body, "application/gzip")}, body
+        body = io.BytesIO(data)
+        return {"file": ("excerpt.txt", body, "text/plain; charset=utf-8")}, body
+
+    @staticmethod
+    def _size(file: IO) -> int:
+        file.seek(0, 2)
+        size = file.tell()
+        file.seek(0)
+        return size
+
+    def _post(self, files: dict, file: IO, data: dict, headers: dict) -> requests.Response:
+        """POST with retries: connection errors, timeouts and RETRY_STATUSES, with jittered exponential backoff."""
+        retries = max(0, self.config.metadata_retries)
+        for attempt in range(retries + 1):
+            file.seek(0) # the whole body again, on every attempt
+            try:
+                response = self.session.post(
+                    self.config.extraction_endpoint,
+                    headers=headers,
+                    files=files,
+                    data=data,
+                    timeout=self.config.metadata_timeout
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+            wait = self._backoff(attempt, response.headers.get("Retry-After"))
+            response.close()
+            print(f"    > Metadata endpoint answered {response.status_code}, retrying in {wait:.1f}s")
+            time.sleep(wait)
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Exponential backoff with full jitter (so that clients do not retry in lockstep), or what the endpoint asked for."""
+        wait = random.uniform(0, self.config.metadata_backoff * (2 ** attempt))
+        asked = self._retry_after(retry_after)
+        return max(wait, asked) if asked is not None else wait
+
+    @staticmethod
+    def _retry_after(value: Optional[str]) -> Optional[float]:
+        """Parses a Retry-After header, given either in seconds or as an HTTP date."""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+            if when.tzinfo is None:
+                when = when.replace(tzinfo=timezone.utc)
+            return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+class AsyncDocMetadataClient:
+    """
+    Async variant: awaitable extractions, at most {max_in_flight} at once, over the pooled session
+    of a DocMetadataClient (each request runs in a worker thread, the event loop is never blocked).
+    """
+
+    def __init__(self, config: Settings, max_in_flight: Optional[int] = None):
+        self.client = DocMetadataClient(config, max_in_flight)
+        self._slots = asyncio.Semaphore(self.client.max_in_flight)
+
+    async def extract(self, file: IO, filename: str = None, content_hash: str = None,
+                      excerpt: Optional[str] = None, payload: Optional[dict] = None) -> dict:
+        async with self._slots:
+            return await asyncio.to_thread(self.client.request, file, filename, content_hash, excerpt, payload)
+
+    def close(self) -> None:
+        self.client.close()
@@ -2,86 +2,307 @@
 # /metadata extraction for downloaded KOs/
 # adriana r.f. (arodriguezf@vicomtech.org)
 # jan-2026
-import json
 import os
+import time
+import asyncio
 from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from typing import Iterable, Iterator, Optional, Tuple
 from tqdm import tqdm
-import random
 from ...config.settings import Settings
 from ..quality.assessment import QualityAssessment
+from ..quality.doc_types.doc import DocQuality, MetadataRequest
+from ..quality.doc_types.docpdf import DocPdf
 from ..quality.doc_types.doctype import DocType
+from ..quality.doc_types.prescreen import StageStats
+from ..quality.features import FeatureStore
+from ..loader.manifest import DownloadManifest
+from ..loader.corpus import iter_documents, largest_first, reservoir_sample
+from .client import AsyncDocMetadataClient, DocMetadataClient
+from .stats import PipelineStats
+from .store import ResultStore, write_json
+
+# documents held (and sized) ahead of the workers to submit the biggest first, when the whole directory is streamed
+LARGEST_FIRST_WINDOW = 256
+
+# structural validator of a worker process (one per process, see _init_worker)
+_WORKER_PDF: Optional[DocPdf] = None
+
+def _init_worker(config: Settings):
+    global _WORKER_PDF
+    # documents are already spread over processes: no nested page-level pool per worker
+    _WORKER_PDF = DocPdf(config.model_copy(update={"pdf_page_workers": 1}))
+
+def _process_structure(file_path: str, content_hash: Optional[str] = None) -> Tuple[DocQuality, Optional[MetadataRequest], float]:
+    """Structural validation of a document, run in a worker process (metadata is extracted back in the main one)."""
+    clock = time.perf_counter()
+    with open(file_path, "rb") as f:
+        # (its text is not sent back: only its verdict, stats and diagnostics)
+        result, request = _WORKER_PDF.process_structure(f, content_hash)
+    return result, request, time.perf_counter() - clock
 
 class DocMetadataExtractor:
     """Process of extraction of metadata from a set of documents."""
     def __init__(self, config: Settings):
         self.config = config
         self.quality_engine = QualityAssessment(config)
+        # structural features of every document, for later rescoring (see rescore.py)
+        self.features = FeatureStore(config.feature_store_path)
+        self.stage_stats = StageStats()
+        self.store: Optional[ResultStore] = None
+        self.json_export = config.metadata_json_export
 
-    def extract_all(self, input_dir: str, valid_output: str, invalid_output: str, n: int):
+    def extract_all(self, input_dir: str, valid_output: str, invalid_output: str, n: int, workers: int = 1, concurrency: int = 1,
+                    store_dir: Optional[str] = None, seed: int = 0):
         """
-        Iterates over a number of n random documents in the input directory, validates their structure, 
+        Iterates over a number of n random documents in the input directory (the same ones for the same {seed}), validates their structure, 
         and extracts metadata accordingly.
-        Saves results and classifies them into valid/invalid JSON files.
+        Saves results, as valid or invalid, into the result store (see ResultStore), and into valid/invalid JSON files if json_export.
+        With {workers} > 1, structural validation is fanned out to that many processes, feeding {concurrency}
+        metadata extractions in flight (see _extract_pipelined).
+        Otherwise, {concurrency} documents are validated at once, to keep that many metadata extractions in flight.
         """
         input_path = Path(input_dir)
-        os.makedirs(valid_output, exist_ok=True)
-        os.makedirs(invalid_output, exist_ok=True)
-        
-        # extract from
-        files = [f for f in input_path.iterdir() if f.suffix.lower() == '.pdf']
-        print(f"[METADATA] Processing {len(files)} files in {input_dir}...")
-
-        if 0 < n < len(files):
-            print(f"[METADATA] Randomly selecting {n} files out of {len(files)} available...")
-            files = random.sample(files, n)     
-        
-
-        for file_path in tqdm(files, unit="file", ncols=80):
+        if self.json_export:
+            os.makedirs(valid_output, exist_ok=True)
+            os.makedirs(invalid_output, exist_ok=True)
+
+        self.store = ResultStore(store_dir or self.config.result_store_dir)
+        try:
+            self._extract_all(input_path, valid_output, invalid_output, n, workers, concurrency, seed)
+        finally:
+            self.store.close()
+
+    def _extract_all(self, input_path: Path, valid_output: str, invalid_output: str, n: int, workers: int, concurrency: int, seed: int):
+        input_dir = str(input_path)
+        if not len(self.store):
+            # records of runs before the store
+            imported = self.store.import_json(valid_output, invalid_output)
+            if imported:
+                print(f"[METADATA] Imported {imported} records from {valid_output} and {invalid_output} into the result store")
+
+        # extract from (streamed: the directory is never listed at once)
+        files = iter_documents(input_dir)
+        if n > 0:
+            files, available = reservoir_sample(files, n, seed)
+            print(f"[METADATA] Randomly selected {len(files)} files out of {available} available in {input_dir} (seed {seed})...")
+        else:
+            print(f"[METADATA] Processing every file in {input_dir}...")
+
+        # content-addressed store: each file is a unique document, possibly served from several URLs
+        # (looked up in the download manifest as each document is stored)
+        manifest = DownloadManifest(input_dir, read_only=True) if DownloadManifest.exists(input_dir) else None
+
+        # like with download of docs, pass if already processed
+        # (a sample is small enough to be listed, the whole directory keeps being streamed)
+        pending = self._unprocessed(files, invalid_output)
+        if n > 0:
+            pending = list(pending)
+            print(f"[METADATA] {len(pending)} files not processed yet")
+
+        self.stage_stats = StageStats()
+        try:
+            if workers > 1:
+                self._extract_pipelined(pending, valid_output, invalid_output, manifest, workers, concurrency)
+            else:
+                self._extract_serial(pending, valid_output, invalid_output, manifest, concurrency)
+        finally:
+            if manifest is not None:
+                manifest.close()
+            self.features.save()
+            if self.stage_stats.documents:
+                for line in self.stage_stats.summary():
+                    print(f"[METADATA] {line}")
+
+    def _unprocessed(self, files: Iterable[Path], invalid_output: str) -> Iterator[Path]:
+        """Documents not in the store yet, as they are listed (those of unsupported types are stored as invalid on the way)."""
+        for file_path in files:
             filename = file_path.name
-            
-            # like with download of docs, pass if already processed
-            if self._already_extracted(filename, valid_output, invalid_output):
+            if filename in self.store:
                 continue
 
             try:
-                doc_type = DocType.get_file_type(filename)
+                DocType.get_file_type(filename)
             except NotImplementedError:
                 self._save(
                     {"filename": filename, "valid_structure": False, "diagnostics": "unsupported extension"}, 
-                    invalid_output, filename
+                    False, filename, invalid_output
                 )
                 continue
+            yield file_path
+
+    def _extract_serial(self, files: Iterable[Path], valid_output: str, invalid_output: str, manifest: Optional[DownloadManifest], concurrency: int = 1):
+        """
+        Validation in this process. With {concurrency} > 1, that many documents are validated by threads at once:
+        parsing still takes turns (GIL), but the metadata extraction calls they wait on overlap.
+        """
+        if concurrency <= 1:
+            for file_path in tqdm(files, unit="file", ncols=80):
+                _, result = self._validate(file_path)
+                if result is not None:
+                    self._store(result, file_path, valid_output, invalid_output, manifest)
+            return
+
+        # the shared metadata client of the quality engine, with as many requests in flight as threads
+        DocMetadataClient.shared(self.config, max_in_flight=concurrency)
+
+        def store(future):
+            file_path, result = future.result()
+            if result is not None:
+                self._store(result, file_path, valid_output, invalid_output, manifest)
+            progress.update()
 
-            # validate their structure
+        progress = tqdm(total=len(files) if isinstance(files, list) else None, unit="file", ncols=80)
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            # a couple of documents per thread submitted at once, not the whole batch
+            pending = set()
+            for file_path in files:
+                if len(pending) >= 2 * concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        store(future)
+                pending.add(pool.submit(self._validate, file_path))
+            for future in as_completed(pending):
+                store(future)
+        progress.close()
+
+    def _validate(self, file_path: Path) -> tuple[Path, Optional[dict]]:
+        # validate their structure
+        try:
+            with open(file_path, "rb") as f:
+                # QualityAssesment.validate calls docpdf.process
+                # which runs your structural score AND calls the metadata client
+                return file_path, self.quality_engine.validate(f, DocType.get_file_type(file_path.name))
+        except Exception as e:
+            print(f"(!) Exception extracting meta from {file_path}: {e}")
+            return file_path, None # next up
+
+    def _extract_pipelined(self, files: Iterable[Path], valid_output: str, invalid_output: str, manifest: Optional[DownloadManifest], workers: int, concurrency: int = 1):
+        """
+        Two overlapping stages: structural validation (pypdf text extraction, CPU-bound) in a pool of worker processes,
+        feeding metadata extraction (remote endpoint, I/O-bound) through a bounded queue, with {concurrency} requests in flight.
+        Semantic validation (topic model, loaded once) is done in this process, once a document has its metadata.
+        Documents already assessed are answered from the result cache, without being sent to the workers (as in validate).
+        Longest jobs first: the biggest files are submitted first, so that no large document
+        is left running alone at the end of the batch (all of a sample, within a window of a streamed directory).
+        """
+        total = len(files) if isinstance(files, list) else None
+        files = largest_first(files, window=total or LARGEST_FIRST_WINDOW)
+        stats = PipelineStats(workers, max(1, concurrency), max(1, self.config.metadata_queue_size))
+        try:
+            asyncio.run(self._pipeline(files, valid_output, invalid_output, manifest, stats, total))
+        finally:
+            for line in stats.summary():
+                print(f"[METADATA] {line}")
+
+    async def _pipeline(self, files: Iterable[Path], valid_output: str, invalid_output: str, manifest: Optional[DownloadManifest], stats: PipelineStats,
+                        total: Optional[int] = None):
+        pdf = self.quality_engine.ko_file_types[DocType.PDF]
+        client = AsyncDocMetadataClient(self.config, stats.slots)
+        # a full queue holds validation back (no more documents are submitted), instead of piling up results
+        queue: asyncio.Queue = asyncio.Queue(maxsize=stats.capacity)
+        progress = tqdm(total=total, unit="file", ncols=80)
+
+        def assess(result: DocQuality, key: Optional[str]) -> dict:
+            assessed = self.quality_engine.assess(result)
+            self.quality_engine.remember(key, assessed)
+            return assessed
+
+        async def finish(file_path: Path, result: DocQuality, key: Optional[str]):
             try:
-                with open(file_path, "rb") as f:
-                    # QualityAssesment.validate calls docpdf.process
-                    # which runs your structural score AND calls the metadata client
-                    result = self.quality_engine.validate(f, doc_type)
+                # (topic inference off the event loop, requests keep flowing meanwhile)
+                assessed = await asyncio.to_thread(assess, result, key)
+                self._store(assessed, file_path, valid_output, invalid_output, manifest)
             except Exception as e:
                 print(f"(!) Exception extracting meta from {file_path}: {e}")
-                continue # next up
-            
-            # KoQuality --> { "valid": bool, "quality": { "structure": ..., "metadata": ... } }
-            record = result.get("quality", {}).get("metadata", {}) or {}
-            full_diagnostics = result.get("quality", {}).get("structure", {})
-            record["size"] = full_diagnostics.get("stats", {})
-            record["valid_structure"] = result["valid"]
-            
-            # metadata extraction results are either saved into the valid or invalid output directories
-            if not result["valid"]:
-                record["diagnostics"] = full_diagnostics.get("diagnose", {})
-                self._save(record, invalid_output, filename)
-            else:
-                self._save(record, valid_output, filename)
-
-    def _already_extracted(self, filename: str, valid_dir: str, invalid_dir: str) -> bool:
-        json_name = f"{filename}.json"
-        return (os.path.exists(os.path.join(valid_dir, json_name)) or 
-                os.path.exists(os.path.join(invalid_dir, json_name)))
-
-    def _save(self, data: dict, output_dir: str, filename: str):
-        """Saves a single JSON record."""
-        out_path = os.path.join(output_dir, f"{filename}.json")
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
\ No newline at end of file
+            progress.update()
+
+        async def validate(pool: ProcessPoolExecutor, file_path: Path, slot: asyncio.Semaphore):
+            try:
+                try:
+                    # (contents hashed here once: the workers look their text up with the same key)
+                    key, cached = await asyncio.to_thread(self._cached, file_path)
+                    if cached is not None:
+                        self._store(cached, file_path, valid_output, invalid_output, manifest)
+                        progress.update()
+                        return
+                    result, request, seconds = await asyncio.wrap_future(pool.submit(_process_structure, str(file_path), key))
+                except Exception as e:
+                    print(f"(!) Exception extracting meta from {file_path}: {e}")
+                    progress.update()
+                    return
+                stats.validation(seconds, queued=request is not None)
+                if request is None:
+                    await finish(file_path, result, key)
+                else:
+                    await queue.put((file_path, result, request, key))
+                    stats.depth(queue.qsize())
+            finally:
+                slot.release()
+
+        async def extract():
+            while (item := await queue.get()) is not None:
+                file_path, result, request, key = item
+                stats.depth(queue.qsize())
+                clock, payload = time.perf_counter(), {}
+                try:
+                    with open(file_path, "rb") as f:
+                        metadata = await client.extract(f, content_hash=request.content_hash, excerpt=request.excerpt, payload=payload)
+                except OSError as e:
+                    metadata = {"diagnostics": {"error": f"unreadable file ({e})"}}
+                seconds = time.perf_counter() - clock
+                stats.extraction(seconds)
+                await finish(file_path, pdf.add_metadata(result, metadata, payload, seconds), key)
+
+        extractors = [asyncio.create_task(extract()) for _ in range(stats.slots)]
+        try:
+            with ProcessPoolExecutor(max_workers=stats.workers, initializer=_init_worker, initargs=(self.config,)) as pool:
+                # a couple of documents per worker submitted at once: the workers never wait for the next one
+                slot, pending = asyncio.Semaphore(2 * stats.workers), set()
+                for file_path in files:
+                    await slot.acquire()
+                    task = asyncio.create_task(validate(pool, file_path, slot))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                await asyncio.gather(*pending)
+            for _ in extractors:
+                await queue.put(None)
+            await asyncio.gather(*extractors)
+        finally:
+            for task in extractors:
+                task.cancel()
+            progress.close()
+            client.close()
+
+    def _cached(self, file_path: Path) -> tuple[Optional[str], Optional[dict]]:
+        """Hash of the contents of a document and its cached assessment, if any (see QualityAssessment.cached)."""
+        with open(file_path, "rb") as f:
+            return self.quality_engine.cached(f)
+
+    def _store(self, result: dict, file_path: Path, valid_output: str, invalid_output: str, manifest: Optional[DownloadManifest]):
+        """Saves the quality assessment of a document as its metadata record."""
+        filename = file_path.name
+        # KoQuality --> { "valid": bool, "quality": { "structure": ..., "metadata": ... } }
+        record = result.get("quality", {}).get("metadata", {}) or {}
+        full_diagnostics = result.get("quality", {}).get("structure", {})
+        record["size"] = full_diagnostics.get("stats", {})
+        record["valid_structure"] = result["valid"]
+        self.stage_stats.add(full_diagnostics)
+        if full_diagnostics.get("features"):
+            self.features.add(filename, full_diagnostics["features"])
+        urls = manifest.sources(str(file_path)) if manifest is not None else None
+        if urls:
+            record["source_urls"] = urls
+
+        # metadata extraction results are either saved as valid or invalid
+        if not result["valid"]:
+            record["diagnostics"] = full_diagnostics.get("diagnose", {})
+            self._save(record, False, filename, invalid_output)
+        else:
+            self._save(record, True, filename, valid_output)
+
+    def _save(self, data: dict, valid: bool, filename: str, output_dir: str):
+        """Saves a single record into the store (and as a JSON file into its output directory, if json_export)."""
+        self.store.put(filename, data, valid)
+        if self.json_export:
+            write_json(data, output_dir, filename)
\ No newline at end of file
@@ -0,0 +1,134 @@
+# standin.py
+# /local stand-in for the metadata extraction service (load testing without the LLM endpoint)/
+# adriana r.f.
+# feb-2026
+
+import gzip
+import math
+import time
+import random
+import asyncio
+import hashlib
+from dataclasses import dataclass, field
+from typing import List, Optional
+from fastapi import FastAPI, File, Form, UploadFile
+from fastapi.responses import JSONResponse
+
+LATENCIES = ("fixed", "uniform", "exponential", "lognormal")
+
+@dataclass
+class StandinProfile:
+    """How the stand-in behaves: latency distribution, error rates and throughput caps."""
+    latency: str = "lognormal"  # one of LATENCIES
+    latency_mean: float = 2.0   # seconds
+    latency_sigma: float = 0.5  # spread (uniform: +/- mean*sigma, lognormal: sigma of the underlying normal)
+    error_rate: float = 0.0     # answers that fail with a 500
+    throttle_rate: float = 0.0  # answers that fail with a 429 (and a Retry-After)
+    max_rps: float = 0.0        # requests accepted per second (0 = unlimited), above that: 429
+    max_concurrent: int = 0     # requests handled at once (0 = unlimited), above that: 503
+    seed: Optional[int] = None  # for reproducible runs
+    topics: List[str] = field(default_factory=lambda: ["topic1"])
+
+class _Counters:
+    def __init__(self):
+        self.requests = self.ok = self.errors = self.throttled = self.overloaded = 0
+        self.in_flight = self.max_in_flight = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+
+def create_standin_app(profile: StandinProfile) -> FastAPI:
+    """
+    Same contract as the metadata extraction endpoint (see DocMetadataClient): multipart POST of a
+    document ("file": PDF, or text excerpt, maybe gzipped) and the "prompt", JSON metadata back.
+    Metadata is made up from the document itself (deterministic per document), after a random latency.
+    """
+    if profile.latency not in LATENCIES:
+        raise ValueError(f"unknown latency distribution '{profile.latency}' (one of: {', '.join(LATENCIES)})")
+    rng = random.Random(profile.seed)
+    counters = _Counters()
+    # token bucket of the rate cap
+    bucket = {"tokens": max(1.0, profile.max_rps), "at": time.monotonic()}
+
+    app = FastAPI(title="Metadata extraction stand-in")
+
+    def latency() -> float:
+        mean, sigma = profile.latency_mean, profile.latency_sigma
+        if profile.latency == "fixed":
+            return mean
+        if profile.latency == "uniform":
+            return max(0.0, rng.uniform(mean * (1 - sigma), mean * (1 + sigma)))
+        if profile.latency == "exponential":
+            return rng.expovariate(1 / mean) if mean > 0 else 0.0
+        # lognormal with the given mean
+        return rng.lognormvariate(0, sigma) * mean * math.exp(-sigma ** 2 / 2)
+
+    def rate_limited() -> bool:
+        if not profile.max_rps:
+            return False
+        now = time.monotonic()
+        bucket["tokens"] = min(max(1.0, profile.max_rps), bucket["tokens"] + (now - bucket["at"]) * profile.max_rps)
+        bucket["at"] = now
+        if bucket["tokens"] < 1:
+            return True
+        bucket["tokens"] -= 1
+        return False
+
+    @app.post("/{path:path}")
+    async def extract(path: str, file: UploadFile = File(...), prompt: str = Form("")):
+        counters.requests += 1
+        if rate_limited():
+            counters.throttled += 1
+            return JSONResponse({"detail": "rate limit"}, status_code=429, headers={"Retry-After": "1"})
+        if profile.max_concurrent and counters.in_flight >= profile.max_concurrent:
+            counters.overloaded += 1
+            return JSONResponse({"detail": "overloaded"}, status_code=503)
+
+        counters.in_flight += 1
+        counters.max_in_flight = max(counters.max_in_flight, counters.in_flight)
+        try:
+            body = await file.read()
+            counters.bytes += len(body)
+            await asyncio.sleep(latency())
+
+            draw = rng.random()
+            if draw < profile.error_rate:
+                counters.errors += 1
+                return JSONResponse({"detail": "extraction failed"}, status_code=500)
+            if draw < profile.error_rate + profile.throttle_rate:
+                counters.throttled += 1
+                return JSONResponse({"detail": "throttled"}, status_code=429, headers={"Retry-After": "1"})
+
+            counters.ok += 1
+            return _metadata(body, file.filename or "", profile.topics)
+        finally:
+            counters.in_flight -= 1
+
+    @app.get("/stats")
+    async def stats():
+        elapsed = time.monotonic() - counters.started
+        counts = {k: v for k, v in vars(counters).items() if k != "started"}
+        return {**counts, "elapsed": elapsed, "throughput": counters.ok / elapsed if elapsed else 0.0}
+
+    return app
+
+def _metadata(body: bytes, filename: str, topics: List[str]) -> dict:
+    """Made-up (but stable) metadata of a document: its first text line as title, if it is text."""
+    digest = hashlib.sha256(body).hexdigest()
+    title = f"Document {digest[:8]}"
+    if filename.endswith(".gz"):
+        body = gzip.decompress(body)
+    if not body.startswith(b"%PDF-"):
+        lines = [l.strip() for l in body.decode("utf-8", "replace").splitlines() if l.strip()]
+        if lines:
+            title = lines[0].removeprefix("title: ")
+    return {
+        "title": title,
+        "subtitle": "",
+        "language": "en",
+        "description": f"Stand-in metadata of {title}.",
+        "locations": [],
+        "topic": topics[int(digest, 16) % len(topics)] if topics else "",
+        "theme": "stand-in",
+        "keywords": ["stand-in"],
+        "licence": "",
+    }
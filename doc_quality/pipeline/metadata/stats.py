@@ -0,0 +1,55 @@
+# stats.py
+# /queue depth and utilisation of the stages of the metadata pipeline/
+# adriana r.f.
+# feb-2026
+
+import time
+from typing import List
+
+class PipelineStats:
+    """
+    How busy each stage of the metadata pipeline was: structural validation (CPU, {workers} processes),
+    metadata extraction (I/O, {slots} requests in flight) and the queue of documents between them.
+    A stage close to 100% is the bottleneck; a full queue means extraction cannot keep up with validation.
+    """
+
+    def __init__(self, workers: int, slots: int, capacity: int):
+        self.workers, self.slots, self.capacity = workers, slots, capacity
+        self.cpu_seconds = self.io_seconds = 0.0
+        self.validated = self.queued = self.extracted = 0
+        self.started = time.perf_counter()
+        # time-weighted queue depth
+        self._depth, self._depth_at, self._depth_area, self.max_depth = 0, self.started, 0.0, 0
+        self.full_seconds = 0.0 # time spent with the queue full (validation waiting on extraction)
+
+    def depth(self, depth: int) -> None:
+        """Records the queue depth, whenever it changes."""
+        now = time.perf_counter()
+        elapsed = now - self._depth_at
+        self._depth_area += self._depth * elapsed
+        if self._depth >= self.capacity:
+            self.full_seconds += elapsed
+        self._depth, self._depth_at = depth, now
+        self.max_depth = max(self.max_depth, depth)
+
+    def validation(self, seconds: float, queued: bool) -> None:
+        self.cpu_seconds += seconds
+        self.validated += 1
+        self.queued += int(queued)
+
+    def extraction(self, seconds: float) -> None:
+        self.io_seconds += seconds
+        self.extracted += 1
+
+    def summary(self) -> List[str]:
+        self.depth(self._depth)
+        wall = max(time.perf_counter() - self.started, 1e-9)
+        cpu = self.cpu_seconds / (self.workers * wall)
+        io = self.io_seconds / (self.slots * wall)
+        return [
+            f"Pipeline: {self.validated} documents validated, {self.extracted}/{self.queued} queued for metadata extracted in {wall:.1f}s",
+            f"  Validation: {self.workers} workers, {cpu:.0%} busy ({self.cpu_seconds:.1f}s)",
+            f"  Extraction: {self.slots} requests in flight, {io:.0%} busy ({self.io_seconds:.1f}s)",
+            f"  Queue: {self._depth_area / wall:.1f} documents on average, {self.max_depth}/{self.capacity} at most, "
+            f"full {self.full_seconds / wall:.0%} of the time",
+        ]
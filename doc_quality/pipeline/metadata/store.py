@@ -0,0 +1,227 @@
+# store.py
+# /append-only store of the metadata records of processed documents (JSONL segments + SQLite index)/
+# adriana r.f.
+# feb-2026
+
+import os
+import json
+import sqlite3
+from pathlib import Path
+from threading import Lock
+from typing import Iterator, Optional, Tuple
+
+INDEX_FILE = "index.sqlite"
+SEGMENT_FILE = "segment-{:05d}.jsonl"
+COMMIT_EVERY = 256 # records between index commits (the segments are the source of truth, see _recover)
+
+class ResultStore:
+    """
+    Metadata record of every processed document (valid and invalid), under its file name: records are appended
+    to JSONL segments (a new one once {segment_bytes} are reached) and located through a SQLite index.
+    Whether a document was already processed is a set lookup, and records are read back in bulk,
+    one segment after another (see records). A document stored again supersedes its previous record.
+    A {read_only} store (e.g. to export it, or to train on it, while a run keeps writing) never recovers nor
+    truncates a segment: it sees the records indexed so far (the index is committed every {COMMIT_EVERY} records, and on close).
+    """
+
+    def __init__(self, store_dir: str, segment_bytes: int = 64_000_000, read_only: bool = False):
+        self.store_dir = str(store_dir)
+        self.segment_bytes = segment_bytes
+        self.read_only = read_only
+        self._lock = Lock()
+        self._uncommitted = 0
+        self._file = None
+        if read_only:
+            self._conn = self._connect()
+            self._keys = {key for (key,) in self._conn.execute("SELECT key FROM records")}
+            return
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        self._conn = self._connect()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "key TEXT PRIMARY KEY, valid INTEGER NOT NULL, segment INTEGER NOT NULL, "
+            "offset INTEGER NOT NULL, length INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+        self._keys = {key for (key,) in self._conn.execute("SELECT key FROM records")}
+
+        segments = self._segments()
+        self._segment = segments[-1] if segments else 0
+        self._recover()
+        self._file = open(self._path(self._segment), "ab")
+
+    @staticmethod
+    def exists(store_dir) -> bool:
+        return os.path.exists(os.path.join(str(store_dir), INDEX_FILE))
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def put(self, key: str, record: dict, valid: bool) -> None:
+        if self.read_only:
+            raise ValueError(f"result store {self.store_dir} was opened read-only")
+        line = (json.dumps({"key": key, "valid": valid, "record": record}, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            if self._file.tell() and self._file.tell() + len(line) > self.segment_bytes:
+                self._rollover()
+            offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO records (key, valid, segment, offset, length) VALUES (?, ?, ?, ?, ?)",
+                (key, int(valid), self._segment, offset, len(line))
+            )
+            self._keys.add(key)
+            self._uncommitted += 1
+            if self._uncommitted >= COMMIT_EVERY:
+                self._commit()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT segment, offset, length FROM records WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        segment, offset, length = row
+        with open(self._path(segment), "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))["record"]
+
+    def records(self, valid: Optional[bool] = None) -> Iterator[Tuple[str, dict]]:
+        """
+        Streams the current (key, record) of every document, or only of the valid/invalid ones,
+        in the order they were written: each segment is read sequentially, once.
+        """
+        self.flush()
+        # own connection: the index can keep being written meanwhile
+        conn = self._connect(check_same_thread=True)
+        try:
+            query = "SELECT segment, offset, length FROM records"
+            if valid is not None:
+                query += f" WHERE valid = {int(valid)}"
+            rows = conn.execute(query + " ORDER BY segment, offset")
+            segment, f = None, None
+            try:
+                for seg, offset, length in rows:
+                    if seg != segment:
+                        if f is not None:
+                            f.close()
+                        segment, f = seg, open(self._path(seg), "rb")
+                    f.seek(offset)
+                    entry = json.loads(f.read(length))
+                    yield entry["key"], entry["record"]
+            finally:
+                if f is not None:
+                    f.close()
+        finally:
+            conn.close()
+
+    def export(self, valid_dir: str, invalid_dir: str) -> int:
+        """Writes every record as its own JSON file, {key}.json, in the valid or invalid directory (layout before the store)."""
+        os.makedirs(valid_dir, exist_ok=True)
+        os.makedirs(invalid_dir, exist_ok=True)
+        n = 0
+        for output_dir, valid in ((valid_dir, True), (invalid_dir, False)):
+            for key, record in self.records(valid):
+                write_json(record, output_dir, key)
+                n += 1
+        return n
+
+    def import_json(self, valid_dir: str, invalid_dir: str) -> int:
+        """Stores the records of a valid/invalid directory of JSON files (layout before the store) not stored yet."""
+        n = 0
+        for input_dir, valid in ((valid_dir, True), (invalid_dir, False)):
+            if not os.path.isdir(input_dir):
+                continue
+            with os.scandir(input_dir) as entries:
+                for entry in entries:
+                    key = entry.name.removesuffix(".json")
+                    if key == entry.name or key in self:
+                        continue
+                    try:
+                        record = json.loads(Path(entry.path).read_text(encoding="utf-8"))
+                    except (OSError, ValueError):
+                        continue
+                    self.put(key, record, valid)
+                    n += 1
+        self.flush()
+        return n
+
+    def flush(self) -> None:
+        with self._lock:
+            self._commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._commit()
+            if self._file is not None:
+                self._file.close()
+            self._conn.close()
+
+    # ---------------------------------------------------------------------------------------
+
+    def _connect(self, check_same_thread: bool = False) -> sqlite3.Connection:
+        path = os.path.join(self.store_dir, INDEX_FILE)
+        if self.read_only:
+            # (a missing index is an error, not a new empty store)
+            return sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True, check_same_thread=check_same_thread)
+        return sqlite3.connect(path, check_same_thread=check_same_thread)
+
+    def _path(self, segment: int) -> str:
+        return os.path.join(self.store_dir, SEGMENT_FILE.format(segment))
+
+    def _segments(self) -> list:
+        names = [e.name for e in os.scandir(self.store_dir) if e.name.startswith("segment-") and e.name.endswith(".jsonl")]
+        return sorted(int(name[len("segment-"):-len(".jsonl")]) for name in names)
+
+    def _commit(self) -> None:
+        if self._uncommitted:
+            self._conn.commit()
+            self._uncommitted = 0
+
+    def _rollover(self) -> None:
+        self._commit()
+        self._file.close()
+        self._segment += 1
+        self._file = open(self._path(self._segment), "ab")
+
+    def _recover(self) -> None:
+        """
+        Indexes the records appended to the last segment after the last index commit (e.g. an interrupted run),
+        and drops a last line that was only partly written.
+        """
+        path = self._path(self._segment)
+        if not os.path.exists(path):
+            return
+        end = self._conn.execute(
+            "SELECT MAX(offset + length) FROM records WHERE segment = ?", (self._segment,)
+        ).fetchone()[0] or 0
+        with open(path, "rb+") as f:
+            f.seek(end)
+            offset = end
+            for line in f:
+                try:
+                    entry = json.loads(line) if line.endswith(b"\n") else None
+                except ValueError:
+                    entry = None
+                if entry is None:
+                    f.truncate(offset)
+                    break
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO records (key, valid, segment, offset, length) VALUES (?, ?, ?, ?, ?)",
+                    (entry["key"], int(entry["valid"]), self._segment, offset, len(line))
+                )
+                self._keys.add(entry["key"])
+                offset += len(line)
+        self._conn.commit()
+
+def write_json(record: dict, output_dir: str, key: str) -> None:
+    """Saves a single record as {key}.json."""
+    out_path = os.path.join(output_dir, f"{key}.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2, ensure_ascii=False)
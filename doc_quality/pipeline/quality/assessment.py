@@ -3,11 +3,19 @@
 # adriana r.f.
 # jan-2026
 
-from typing import IO
+import os
+import json
+import hashlib
+import threading
+from typing import IO, Optional, Tuple
 from ...config.settings import Settings
 from .doc_types.doctype import DocType
+from .doc_types import docpdf
 from .doc_types.docpdf import DocPdf
+from .doc_types.doc import DocQuality
+from .doc_types.textcache import TextCache
 from .topics import DocTopic
+from .cache import ResultCache
 
 class QualityAssessment:
     """Automatically assesses quality of a document, regarding structure and semantics."""
@@ -25,15 +33,81 @@ class QualityAssessment:
             #TODO: KoType.PPT: KoPpt(config)
         }
 
-    def validate(self, file: IO, file_type: DocType) -> dict:
-        """Assesses the quality of a document regarding its structure and text stats, and its semantic relevance within the topic model space."""
+        # documents may be validated from several threads (see DocMetadataExtractor): one topic inference at a time
+        self._topics_lock = threading.Lock()
+
+        # already assessed documents (same contents, same thresholds/prompt/topic model)
+        self.cache = None
+        if config.result_cache:
+            self.cache = ResultCache(str(config.result_cache_dir), capacity=config.result_cache_size)
+            self._heuristics_version = self._hash(
+                self.ko_file_types[DocType.PDF].backend.version(), config.pdf_early_exit,
+                config.pdf_max_seconds, config.pdf_max_pages, config.pdf_max_decompressed_bytes,
+                {k: v for k, v in vars(docpdf).items() if k.isupper()} # thresholds, keywords, patterns
+            )
+            # the topic model is loaded once (above): so is its identity
+            self._topics_version = self._fingerprint(self.config.topic_model)
+            self._version: Optional[tuple] = None # (prompt file stamp, version key)
+            self._version_lock = threading.Lock()
+            self.cache.purge(self.version_key())
+
+    def validate(self, file: IO, file_type: DocType, content_hash: Optional[str] = None) -> dict:
+        """
+        Assesses the quality of a document regarding its structure and text stats, and its semantic relevance within the topic model space.
+        Documents already assessed are answered from the cache ({content_hash}: hash of the contents, if already known).
+        """
         ko = self.ko_file_types.get(file_type)
         if not ko:
             return {"valid": False, "diagnose": f"unsupported file type: {file_type.value}"}
 
+        key, cached = self.cached(file, content_hash)
+        if cached is not None:
+            return cached
+
         # ** STRUCTURAL VALIDATION **
         # if structurally valid, respective metadata is extracted
-        result = ko.process(file)
+        # (the contents are hashed once: the key also keys the cached text, see DocPdf._read)
+        result = self.assess(ko.process(file, content_hash=key))
+        self.remember(key, result)
+        return result
+
+    def cached(self, file: IO, content_hash: Optional[str] = None) -> Tuple[Optional[str], Optional[dict]]:
+        """Hash of the contents of a document (None without a cache) and its cached assessment, if any."""
+        if self.cache is None:
+            return content_hash, None
+        key = content_hash or TextCache.key(file)
+        return key, self.cache.get(key, self.version_key())
+
+    def remember(self, key: Optional[str], result: dict) -> None:
+        """Caches the assessment of a document (see cached)."""
+        # a failed metadata call is not an answer worth keeping
+        if self.cache is None or key is None or result["quality"]["metadata"].get("diagnostics", {}).get("error"):
+            return
+        self.cache.put(key, self.version_key(), result)
+
+    def version_key(self) -> str:
+        """
+        Version of everything a result depends on besides the document: heuristics, prompt, metadata endpoint, topic model.
+        Computed once, and again only when the prompt file changes (the prompt is read again then, see PromptCache).
+        """
+        try:
+            st = os.stat(self.config.prompt_path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        with self._version_lock:
+            if self._version is None or self._version[0] != stamp:
+                self._version = (stamp, self._hash(
+                    self._heuristics_version,
+                    self._fingerprint(self.config.prompt_path),
+                    self.config.extraction_endpoint, self.config.metadata_payload, self.config.metadata_excerpt_tokens,
+                    self._topics_version,
+                    self.config.embedding_model, self.config.min_topic_prob, self.config.topic_targets,
+                ))
+            return self._version[1]
+
+    def assess(self, result: DocQuality) -> dict:
+        """Completes the structural results of a document (see Document.process) with its semantic validation."""
         full_diagnostics = {
             "structure": result.diagnostics, 
             "metadata": result.metadata
@@ -43,10 +117,28 @@ class QualityAssessment:
         # once metadata is extracted, 
         is_sem_valid = False
         if result.is_struct_valid:
-            is_sem_valid, sem_diag = self.topics.get_topic(result.metadata)
+            with self._topics_lock:
+                is_sem_valid, sem_diag = self.topics.get_topic(result.metadata)
             full_diagnostics["topic"] = sem_diag
 
         return {
             "valid": result.is_struct_valid and is_sem_valid,
             "quality": full_diagnostics,
-        }
\ No newline at end of file
+        }
+
+    # ---------------------------------------------------------------------------------------
+
+    def _fingerprint(self, path) -> str:
+        """Identity of a file (or of the files of a directory): paths, sizes and modification times."""
+        path = str(path)
+        if not os.path.exists(path):
+            return "missing"
+        if os.path.isfile(path):
+            entries = [path]
+        else:
+            entries = sorted(e.path for e in os.scandir(path) if e.is_file())
+        return self._hash([(f, os.stat(f).st_mtime_ns, os.stat(f).st_size) for f in entries])
+
+    @staticmethod
+    def _hash(*parts) -> str:
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,73 @@
+# benchmark.py
+# /speed and fidelity of each PDF text-extraction backend over a sample of documents/
+# adriana r.f.
+# feb-2026
+
+import sys
+import time
+import resource
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+from ...config.settings import Settings
+from .doc_types.docpdf import DocPdf
+
+REFERENCE = "pypdf" # verdicts of every other backend are compared with its own
+
+def run_backend(name: str, files: List[str], config: Settings) -> dict:
+    """
+    Structural verdict of every file with a given backend (no metadata extraction), with its throughput.
+    Meant to run in a fresh process, so that its peak RSS is the backend's own.
+    """
+    # every page extracted, by this process alone, from the files themselves
+    config = config.model_copy(update={"pdf_backend": name, "text_cache": False, "pdf_early_exit": False, "pdf_page_workers": 1})
+    doc = DocPdf(config)
+
+    verdicts, types = {}, {}
+    pages, seconds = 0, 0.0
+    for path in files:
+        start = time.perf_counter()
+        with open(path, "rb") as f:
+            result = doc.process(f, with_metadata=False)
+        elapsed = time.perf_counter() - start
+        verdicts[path] = result.is_struct_valid
+        types[path] = result.diagnostics["stats"].get("type")
+        # throughput over the documents actually extracted (not stopped by the pre-screen)
+        if "extraction" in result.diagnostics.get("stages", {}):
+            pages += result.diagnostics["stats"]["num_pages"]
+            seconds += elapsed
+
+    # KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1 << 20) if sys.platform == "darwin" else peak / (1 << 10)
+    return {
+        "backend": name,
+        "documents": len(files),
+        "pages": pages,
+        "seconds": seconds,
+        "pages_per_sec": pages / seconds if seconds else 0.0,
+        "peak_rss_mb": peak_mb,
+        "valid": sum(verdicts.values()),
+        "verdicts": verdicts,
+        "types": types,
+    }
+
+def benchmark(files: List[str], backends: List[str], config: Settings) -> List[dict]:
+    """Runs every backend over the same files, each one in its own (spawned) process."""
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for name in backends:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            results.append(pool.submit(run_backend, name, files, config).result())
+    return results
+
+def differences(reference: dict, other: dict) -> Dict[str, object]:
+    """Documents whose structural verdict (or typology) differs between two backend runs."""
+    flipped = [f for f, valid in reference["verdicts"].items() if other["verdicts"].get(f) != valid]
+    return {
+        "verdict_changes": len(flipped),
+        "to_valid": sum(1 for f in flipped if other["verdicts"][f]),
+        "to_invalid": sum(1 for f in flipped if not other["verdicts"][f]),
+        "typology_changes": sum(1 for f, t in reference["types"].items() if other["types"].get(f) != t),
+        "files": flipped,
+    }
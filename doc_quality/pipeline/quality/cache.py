@@ -0,0 +1,91 @@
+# cache.py
+# /cache of quality assessments, keyed by document content + version of what produced them/
+# adriana r.f.
+# feb-2026
+
+import os
+import json
+import time
+import sqlite3
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+CACHE_FILE = "results.sqlite"
+
+class ResultCache:
+    """
+    Quality assessments of already seen documents: a small in-memory LRU in front of a SQLite store.
+    Entries are keyed by the hash of the document contents and only valid for the version key they
+    were computed with (heuristic thresholds, prompt, topic model...): any other version is a miss.
+    Results are kept serialized, so that callers always get a fresh copy they are free to modify.
+    """
+
+    def __init__(self, cache_dir: str, capacity: int = 1024):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.capacity = max(0, capacity)
+        self._memory: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = Lock()
+        self._conn = sqlite3.connect(os.path.join(cache_dir, CACHE_FILE), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, version TEXT NOT NULL, result TEXT NOT NULL, created_at REAL)"
+        )
+        self._conn.commit()
+        self.hits = self.misses = 0
+
+    def get(self, key: str, version: str) -> Optional[dict]:
+        with self._lock:
+            cached = self._memory.get((key, version))
+            if cached is not None:
+                self._memory.move_to_end((key, version))
+            else:
+                row = self._conn.execute(
+                    "SELECT result FROM results WHERE key = ? AND version = ?", (key, version)
+                ).fetchone()
+                if row:
+                    cached = row[0]
+                    self._remember((key, version), cached)
+
+            if cached is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(cached)
+
+    def put(self, key: str, version: str, result: dict) -> None:
+        serialized = json.dumps(result, ensure_ascii=False, default=str)
+        with self._lock:
+            self._remember((key, version), serialized)
+            # a single row per document: a new version replaces the previous one
+            self._conn.execute(
+                "INSERT INTO results (key, version, result, created_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET version = excluded.version, result = excluded.result, "
+                "created_at = excluded.created_at",
+                (key, version, serialized, time.time()),
+            )
+            self._conn.commit()
+
+    def purge(self, version: str) -> int:
+        """Drops the entries of any other version, returns how many."""
+        with self._lock:
+            self._memory = OrderedDict((k, v) for k, v in self._memory.items() if k[1] == version)
+            deleted = self._conn.execute("DELETE FROM results WHERE version != ?", (version,)).rowcount
+            self._conn.commit()
+        return deleted
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---------------------------------------------------------------------------------------
+
+    def _remember(self, key: tuple, serialized: str) -> None:
+        if not self.capacity:
+            return
+        self._memory[key] = serialized
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
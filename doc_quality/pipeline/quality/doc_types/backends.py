@@ -0,0 +1,262 @@
+# backends.py
+# /[strategy] PDF libraries the text of a document can be extracted with/
+# adriana r.f.
+# feb-2026
+
+import io
+import zlib
+import importlib
+import importlib.util
+from abc import ABC, abstractmethod
+from typing import IO, Dict, List, Optional, Type, Union
+from pypdf import PdfReader
+from .budget import PdfBudget
+from .textcache import EXTRACTOR_VERSION
+
+Source = Union[IO, str, bytes] # open file, path or raw bytes
+
+INFLATE_CHUNK = 1 << 20 # bytes inflated at a time when measuring a content stream (see inflated_size)
+
+def inflated_size(raw: bytes, limit: int) -> Optional[int]:
+    """
+    Size of a FlateDecode stream once decompressed, inflated chunk by chunk and never kept:
+    stops as soon as it is over {limit} (returning limit + 1), so a decompression bomb is never decoded in full.
+    None if the stream is not valid zlib data (left to the library to decode, or not).
+    """
+    inflater = zlib.decompressobj()
+    size, data = 0, raw
+    try:
+        while data and size <= limit:
+            size += len(inflater.decompress(data, INFLATE_CHUNK))
+            data = inflater.unconsumed_tail
+            if not data and not inflater.eof:
+                size += len(inflater.flush())
+    except zlib.error:
+        return None
+    return min(size, limit + 1)
+
+class PdfBackend(ABC):
+    """
+    An open PDF, as seen by one text-extraction library: encryption, pages, images and the text of each page.
+    Pages are extracted within the budget of their document (time is checked at least before every page).
+    """
+
+    name: str = ""
+    module: str = ""  # library it needs (imported only when used)
+    package: str = "" # pip package of that library
+    revision = 1      # bump whenever the text it extracts could change (see TextCache)
+
+    @classmethod
+    def available(cls) -> bool:
+        return importlib.util.find_spec(cls.module) is not None
+
+    @classmethod
+    def lib(cls):
+        return importlib.import_module(cls.module)
+
+    @classmethod
+    def version(cls) -> str:
+        """Identifies the text it extracts (library and extraction code), e.g. for cached text."""
+        return f"{cls.name}-{getattr(cls.lib(), '__version__', 'unknown')}.{cls.revision}"
+
+    @property
+    @abstractmethod
+    def is_encrypted(self) -> bool: ...
+
+    @property
+    @abstractmethod
+    def num_pages(self) -> int: ...
+
+    def declared_pages(self) -> int:
+        """Page count as cheaply as the library allows (e.g. without walking the page tree)."""
+        return self.num_pages
+
+    @abstractmethod
+    def has_images(self) -> bool: ...
+
+    @abstractmethod
+    def page_text(self, i: int, budget: Optional[PdfBudget] = None) -> str: ...
+
+    # ---------------------------------------------------------------------------------------
+
+    @staticmethod
+    def _bytes(source: Source) -> bytes:
+        if isinstance(source, bytes):
+            return source
+        if isinstance(source, str):
+            with open(source, "rb") as f:
+                return f.read()
+        source.seek(0)
+        return source.read()
+
+class PypdfBackend(PdfBackend):
+    """Pure Python, always installed: the reference the others are benchmarked against."""
+
+    name, module, package = "pypdf", "pypdf", "pypdf"
+
+    def __init__(self, source: Source):
+        self.reader = PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+    @classmethod
+    def version(cls) -> str:
+        return EXTRACTOR_VERSION # (as named before there were other backends: same cached text)
+
+    @property
+    def is_encrypted(self) -> bool:
+        return self.reader.is_encrypted
+
+    @property
+    def num_pages(self) -> int:
+        return len(self.reader.pages)
+
+    def declared_pages(self) -> int:
+        # /Count of the page tree root: no need to load every page
+        try:
+            return int(self.reader.trailer["/Root"]["/Pages"]["/Count"])
+        except Exception:
+            return self.num_pages
+
+    def has_images(self) -> bool:
+        # TODO: check image extraction
+        return any('/XObject' in p.get('/Resources', {}) for p in self.reader.pages)
+
+    def page_text(self, i: int, budget: Optional[PdfBudget] = None) -> str:
+        page = self.reader.pages[i]
+        if budget is None:
+            return page.extract_text() or ""
+        budget.check_time()
+        if budget.max_bytes:
+            budget.add_bytes(self._contents_size(page, budget.bytes_left()))
+        return page.extract_text(visitor_operand_before=budget.check_time) or ""
+
+    @staticmethod
+    def _contents_size(page, limit: int) -> int:
+        """Decompressed size of the content streams of a page, measured before pypdf decodes them (see inflated_size)."""
+        contents = page.get("/Contents")
+        if contents is None:
+            return 0
+        contents = contents.get_object()
+        streams = [s.get_object() for s in contents] if isinstance(contents, list) else [contents]
+        size = 0
+        for stream in streams:
+            filters = stream.get("/Filter")
+            filters = list(filters) if isinstance(filters, list) else [filters] if filters else []
+            raw = getattr(stream, "_data", b"") or b""
+            measured = None
+            if not filters:
+                measured = len(raw)
+            elif filters == ["/FlateDecode"]:
+                measured = inflated_size(raw, limit - size)
+            if measured is None:
+                # other filters (rarely a bomb): decoded to be measured
+                measured = len(stream.get_data())
+            size += measured
+            if size > limit:
+                break
+        return size
+
+class PymupdfBackend(PdfBackend):
+    """MuPDF (C library): much faster, lays out the text line by line."""
+
+    name, module, package = "pymupdf", "pymupdf", "pymupdf"
+
+    def __init__(self, source: Source):
+        fitz = self.lib()
+        if isinstance(source, str):
+            self.doc = fitz.open(source)
+        else:
+            self.doc = fitz.open(stream=self._bytes(source), filetype="pdf")
+
+    @property
+    def is_encrypted(self) -> bool:
+        return bool(self.doc.needs_pass)
+
+    @property
+    def num_pages(self) -> int:
+        return self.doc.page_count
+
+    def has_images(self) -> bool:
+        return any(page.get_images() for page in self.doc)
+
+    def page_text(self, i: int, budget: Optional[PdfBudget] = None) -> str:
+        page = self.doc.load_page(i)
+        if budget is not None:
+            budget.check_time()
+            if budget.max_bytes:
+                budget.add_bytes(self._contents_size(page, budget.bytes_left()))
+        return page.get_text().rstrip("\n")
+
+    def _contents_size(self, page, limit: int) -> int:
+        """Decompressed size of the content streams of a page, measured before MuPDF decodes them (see inflated_size)."""
+        size = 0
+        for xref in page.get_contents():
+            kind, value = self.doc.xref_get_key(xref, "Filter")
+            raw = self.doc.xref_stream_raw(xref) or b""
+            measured = None
+            if kind == "null":
+                measured = len(raw)
+            elif value in ("/FlateDecode", "[/FlateDecode]"):
+                measured = inflated_size(raw, limit - size)
+            if measured is None:
+                measured = len(self.doc.xref_stream(xref) or b"")
+            size += measured
+            if size > limit:
+                break
+        return size
+
+class PdfiumBackend(PdfBackend):
+    """PDFium (Chromium's C++ library): fast, no per-operator time checks (time is checked per page)."""
+
+    name, module, package = "pypdfium2", "pypdfium2", "pypdfium2"
+
+    def __init__(self, source: Source):
+        pdfium = self.lib()
+        self.encrypted = False
+        try:
+            self.doc = pdfium.PdfDocument(source if isinstance(source, str) else self._bytes(source))
+        except pdfium.PdfiumError as e:
+            if "password" not in str(e).lower():
+                raise
+            self.doc, self.encrypted = None, True
+
+    @classmethod
+    def version(cls) -> str:
+        # bindings + bundled PDFium build
+        info = importlib.import_module("pypdfium2.version")
+        return f"{cls.name}-{info.PYPDFIUM_INFO}-{info.PDFIUM_INFO}.{cls.revision}"
+
+    @property
+    def is_encrypted(self) -> bool:
+        return self.encrypted
+
+    @property
+    def num_pages(self) -> int:
+        return len(self.doc) if self.doc is not None else 0
+
+    def has_images(self) -> bool:
+        image = importlib.import_module("pypdfium2.raw").FPDF_PAGEOBJ_IMAGE
+        for i in range(self.num_pages):
+            if next(self.doc[i].get_objects(filter=[image]), None) is not None:
+                return True
+        return False
+
+    def page_text(self, i: int, budget: Optional[PdfBudget] = None) -> str:
+        # (decompressed bytes are not exposed by PDFium: only time is budgeted)
+        if budget is not None:
+            budget.check_time()
+        text = self.doc[i].get_textpage().get_text_range()
+        return text.replace("\r\n", "\n").rstrip("\n")
+
+BACKENDS: Dict[str, Type[PdfBackend]] = {b.name: b for b in (PypdfBackend, PymupdfBackend, PdfiumBackend)}
+
+def available_backends() -> List[str]:
+    """Backends whose library is installed here."""
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+def get_backend(name: str) -> Type[PdfBackend]:
+    backend = BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"unknown PDF backend '{name}' (one of: {', '.join(BACKENDS)})")
+    if not backend.available():
+        raise ImportError(f"PDF backend '{name}' needs {backend.module} (pip install {backend.package})")
+    return backend
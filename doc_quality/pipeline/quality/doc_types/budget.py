@@ -0,0 +1,57 @@
+# budget.py
+# /resources a single document may take to be parsed/
+# adriana r.f.
+# feb-2026
+
+import time
+from typing import Optional
+
+class BudgetExceeded(Exception):
+    """A document went over one of its parsing budgets (time, pages or decompressed bytes)."""
+
+class PdfBudget:
+    """
+    Resources a single document may take to be parsed: wall-clock seconds, number of pages
+    and decompressed bytes of its page contents (0/None: unlimited).
+    Time is a deadline on the monotonic clock, set on creation: it keeps running while the document waits
+    (GIL, I/O, page workers), and holds in the worker processes it is sent to (same clock on the same machine).
+    Time is checked before every page and for every operator of a content stream being extracted.
+    """
+
+    def __init__(self, max_seconds: Optional[float] = None, max_pages: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.max_seconds = max_seconds
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.deadline = time.monotonic() + max_seconds if max_seconds else None
+        self.bytes = 0
+
+    def remaining(self, share: int = 1) -> "PdfBudget":
+        """
+        What is left of this budget, as a new one with the same deadline, its bytes split into {share} equal parts
+        (e.g. one for each page range extracted by a worker process: together they cannot inflate more than what is left).
+        """
+        budget = PdfBudget(
+            max_seconds=self.max_seconds,
+            max_pages=self.max_pages,
+            max_bytes=max(1, (self.max_bytes - self.bytes) // share) if self.max_bytes else None,
+        )
+        budget.deadline = self.deadline
+        return budget
+
+    def bytes_left(self) -> Optional[int]:
+        """Decompressed bytes still allowed (None: unlimited)."""
+        return max(0, self.max_bytes - self.bytes) if self.max_bytes else None
+
+    def check_pages(self, num_pages: int) -> None:
+        if self.max_pages and num_pages > self.max_pages:
+            raise BudgetExceeded(f"{num_pages} pages (max. {self.max_pages})")
+
+    def check_time(self, *_) -> None:
+        # also used as a pypdf visitor: called with the operator and its operands
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise BudgetExceeded(f"parsing took more than {self.max_seconds:g}s")
+
+    def add_bytes(self, n: int) -> None:
+        self.bytes += n
+        if self.max_bytes and self.bytes > self.max_bytes:
+            raise BudgetExceeded(f"more than {self.max_bytes} decompressed bytes of page contents")
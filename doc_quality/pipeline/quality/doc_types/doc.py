@@ -3,20 +3,25 @@
 # adriana r.f.
 # jan-2026
 from abc import ABC, abstractmethod
-from typing import IO, Dict, Any
+from typing import IO, Dict, Any, Optional
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True)
+class MetadataRequest:
+    """What the metadata of a structurally valid document is extracted from (see DocMetadataClient)."""
+    content_hash: Optional[str] = None # hash of the file contents, if already known
+    excerpt: Optional[str] = None      # text sent instead of the whole file, if any
+
+@dataclass(slots=True)
 class DocQuality:
     is_struct_valid: bool
-    text: str
     metadata: Dict[str, Any]
     diagnostics: Dict[str, Any]
 
 class Document(ABC):
     """Processing of different, supported Knowledge Object file types."""
-    
+
     @abstractmethod
-    def process(self, file: IO) -> DocQuality:
+    def process(self, file: IO, content_hash: Optional[str] = None) -> DocQuality:
         """Extracts text, metadata and validates structural integrity, in order to retrieve doc Quality results for a given document."""
-        pass # respective impl. in each doc{mimetype}.py class, e.g. [docpdf.py]
\ No newline at end of file
+        pass # respective impl. in each doc{mimetype}.py class, e.g. [docpdf.py]
@@ -2,12 +2,21 @@
 # /[strategy] processing of PDF documents (typology-dependent)/
 # adriana r.f.
 # feb-2026
+import os
 import re
-from typing import IO
-from pypdf import PdfReader
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Dict, List, Optional
 from ....config.settings import Settings
 from ...metadata.client import DocMetadataClient
-from .doc import Document, DocQuality
+from .doc import Document, DocQuality, MetadataRequest
+from .pdftext import LazyPdfText, PdfBudget, BudgetExceeded, extract_page_range
+from .backends import PdfBackend, get_backend
+from .textcache import TextCache
+from .prescreen import PreScreen
+from . import textstats
+from .matcher import PatternMatcher
 
 # --- CONSTANTS & HEURISTIC THRESHOLDS ---
 # TODO: to-be-defined by WP4
@@ -24,6 +33,13 @@ AVG_CHARS = 200
 
 LINE_LEN = 20
 
+BIG_TYPES = ["SCIENTIFIC / TECHNICAL PAPER", "PROJECT REPORT", "PROJECT DELIVERABLE"] # bonus for a lot of text
+
+TYPOLOGY_SAMPLE = 5000 # chars at the start/end of the text used to classify its typology
+TITLE_SCAN_LINES = 20  # first non-empty lines searched for a title
+EXCERPT_CHARS_PER_TOKEN = 4 # (rough) size of the excerpt sent for metadata extraction
+FEATURES_VERSION = 2 # columns of the feature rows (see _features): part of the version of cached results
+
 MAX_BRIEF_PAGES = 5
 
 MAX_SCIENTIFIC_PAGES = 15
@@ -55,6 +71,13 @@ HEADER_SKIP_RE = [
     r"call identifier"
 ]
 
+# section headers hinting at a typology
+SECTION_RE = {
+    "references": r"(?m)^\s*(references|bibliography)\s*$",
+    "scientific": r"(?m)^\s*(abstract|introduction|methodology)\s*$",
+    "toc": r"(?m)^\s*(table of contents|contents|index)\s*$"
+}
+
 KEYWORDS = {
         "BRIEF": [
             "practice abstract", "policy brief", "factsheet", "executive summary", 
@@ -84,20 +107,85 @@ class DocPdf(Document):
     
     def __init__(self, config: Settings):
         self.config = config
-        self.noise_patterns = [re.compile(p, re.IGNORECASE) for p in NOISE_RE]
-        self.skip_patterns = [re.compile(p, re.IGNORECASE) for p in HEADER_SKIP_RE]
+        # every keyword category + noise/skip line class, compiled once
+        self.matcher = PatternMatcher(KEYWORDS, {"noise": NOISE_RE, "skip": HEADER_SKIP_RE})
+        self.section_patterns = {name: re.compile(p) for name, p in SECTION_RE.items()}
+        self._page_pool = None # only started once a large enough document shows up
+        self._page_pool_lock = threading.Lock()
+        # library the text is extracted with (its version keys the cached text)
+        self.backend = get_backend(config.pdf_backend)
+        self.text_cache = TextCache(config.text_cache_dir, version=self.backend.version()) if config.text_cache else None
+        self.prescreen = PreScreen(self.backend)
+
+    def process(self, file: IO, with_metadata: bool = True, content_hash: Optional[str] = None) -> DocQuality:
+        """Determines structural quality results for a given document of PDF type
+        (structural verdict only, without extracting metadata, if not {with_metadata}; {content_hash}: hash of the contents, if already known)."""
+        result, request = self.process_structure(file, content_hash)
+
+        # only extract metadata if preliminary valid structure
+        if request is not None and with_metadata:
+            clock, payload = time.perf_counter(), {}
+            metadata = DocMetadataClient.extract(
+                file=file, 
+                config=self.config,
+                content_hash=request.content_hash,
+                excerpt=request.excerpt,
+                payload=payload
+            )       
+            self.add_metadata(result, metadata, payload, time.perf_counter() - clock)
+        return result
 
-    def process(self, file: IO) -> DocQuality:
-        """Determines structural quality results for a given document of PDF type."""
+    def process_structure(self, file: IO, content_hash: Optional[str] = None) -> tuple[DocQuality, Optional[MetadataRequest]]:
+        """
+        Structural verdict of a PDF, and what its metadata should be extracted from if structurally valid
+        (None otherwise): metadata can then be extracted elsewhere, e.g. by a pool of requests (see add_metadata).
+        """
         
-        # read the PDF + gather size/text statistics
-        # then, classify the document according to its typology
-        text, stats = self._read(file)
-        assigned_type = self._classify_typology(text, stats)
-        stats["type"] = assigned_type
+        # time spent in each stage, to see what the pre-screen saves
+        stages, clock = {}, time.perf_counter()
+
+        # bounded resources: time, pages and decompressed bytes
+        budget = PdfBudget(self.config.pdf_max_seconds, self.config.pdf_max_pages, self.config.pdf_max_decompressed_bytes)
+
+        # pre-screen (header, size, page tree only) + read the PDF, or its cached text
+        try:
+            doc_text, stats = self._read(file, budget, stages, content_hash)
+        except BudgetExceeded as e:
+            return self._over_budget(e, {"num_pages": 0, "bytes": 0}), None
+        if doc_text is None:
+            return self._prescreened(stats, stages), None
+        raw_stats = dict(stats)
+
+        # gather size/text statistics
+        # then, classify the document according to its typology (from its first and last pages)
+        clock = time.perf_counter()
+        try:
+            signals = self._typology_signals(doc_text)
+            assigned_type = self._classify_typology(signals, stats)
+            stats["type"] = assigned_type
+            early = self._early_decision(doc_text, stats, assigned_type) if self.config.pdf_early_exit else None
+            if not early:
+                self._extract_all(doc_text, file)
+        except BudgetExceeded as e:
+            return self._over_budget(e, stats), None
+        except Exception:
+            # a page that cannot be extracted makes the whole document unreadable
+            key = doc_text.key
+            doc_text, stats = LazyPdfText(), {"num_pages": 0, "bytes": 0}
+            doc_text.key, doc_text.new_pages, raw_stats = key, 1, dict(stats)
+            signals = self._typology_signals(doc_text)
+            assigned_type = self._classify_typology(signals, stats)
+            stats["type"] = assigned_type
+            early = None
+        self._cache_text(doc_text, raw_stats)
+        stages["extraction"], clock = time.perf_counter() - clock, time.perf_counter()
         
         # once stats+text are processed and typology assigned
-        score, diagnostics, full_stats = self._diagnose(text, stats, assigned_type)
+        if early:
+            score, diagnostics, full_stats = early
+            diagnostics["early_exit"] = f"decided from {doc_text.extracted_pages} of {doc_text.num_pages} pages"
+        else:
+            score, diagnostics, full_stats = self._diagnose(doc_text.partial(), stats, assigned_type)
         
         is_valid = (score >= MIN_SCORE)
         
@@ -108,55 +196,85 @@ class DocPdf(Document):
             diagnostics["typology_check"] = "could not match EUFB typology"
             score = 0 
         
-        avg_chars_per_page = stats["text_len"] / max(1, stats["num_pages"])
-        if stats["num_pages"] > 2 and avg_chars_per_page < AVG_CHARS:
+        # (an early reject was not decided on the whole text: its density is unknown)
+        avg_chars_per_page = full_stats["text_len"] / max(1, full_stats["num_pages"])
+        if full_stats["num_pages"] > 2 and avg_chars_per_page < AVG_CHARS and not (early and not is_valid):
             is_valid = False
             diagnostics["content_check"] = "document appears to be empty tables or sparse text"
             score = 0
         
-        # only extract metadata if preliminary valid structure
-        metadata = {}
+        stages["scoring"] = time.perf_counter() - clock
+        # what metadata is extracted from: taken before the text is dropped
+        request = None
         if is_valid:
-            metadata = KoMetadataClient.extract(
-                file=file, 
-                config=self.config
-            )       
-
-            # TODO: check which else to include in this check
-            if not metadata.get("title") and not metadata.get("topic"):
-                is_valid = False
-                diagnostics["metadata"] = "structurally valid but [wrt. extracted metadata] semantically invalid"
-        
-        return KoQuality(
+            excerpt = None
+            if self.config.metadata_payload == "excerpt":
+                excerpt = self._excerpt(doc_text, full_stats.get("headers", {}))
+            request = MetadataRequest(content_hash=doc_text.key, excerpt=excerpt)
+        # (pages and reader are not kept alive through metadata extraction)
+        doc_text = None
+
+        # what the heuristics were computed from, to rescore without the documents (see rescore.py)
+        features = self._features(signals, full_stats, score, is_valid, None, partial=bool(early))
+        full_stats["avg_line_len"] = round(full_stats["avg_line_len"], 2) # (exact in the features only)
+
+        result = DocQuality(
             is_struct_valid=is_valid,
-            text=text,
-            metadata=metadata,
-            diagnostics={"diagnose": diagnostics, "stats": full_stats, "score": score}
+            metadata={},
+            diagnostics={
+                "diagnose": diagnostics, "stats": full_stats, "score": score,
+                "features": features,
+                "stages": stages
+            }
         )
+        return result, request
+
+    def add_metadata(self, result: DocQuality, metadata: dict, payload: dict, seconds: float) -> DocQuality:
+        """Completes the results of a structurally valid document with its extracted metadata."""
+        result.metadata = metadata
+        diagnostics = result.diagnostics
+
+        # TODO: check which else to include in this check
+        metadata_ok = bool(metadata.get("title") or metadata.get("topic"))
+        if not metadata_ok:
+            result.is_struct_valid = False
+            diagnostics["diagnose"]["metadata"] = "structurally valid but [wrt. extracted metadata] semantically invalid"
+        diagnostics["features"]["metadata_ok"] = metadata_ok
+        diagnostics["stages"]["metadata"] = seconds
+        # bytes of the file and actually sent for metadata extraction (none if answered from cache)
+        if payload:
+            diagnostics["payload"] = payload
+        return result
         
     # ---------------------------------------------------------------------------------------        
 
-    def _classify_typology(self, text: str, stats: dict) -> str:
-        """Preliminarily determines document category based on structural hints and patterns."""
-        num_pages = stats.get("num_pages", 0)
-        
+    def _typology_signals(self, text: LazyPdfText) -> dict:
+        """Structural hints and keyword patterns a typology is decided from (first and last pages only)."""
         # 1. Prepare segments (Focus on relevant areas to reduce noise)
         # start: titles, abstracts, document codes                       
-        text_start = text[:5000].lower() 
+        text_start = text.head(TYPOLOGY_SAMPLE).lower() 
         # end: references, appendices, contact info
-        text_end = text[-5000:].lower()
-        full_sample = " ".join((text_start + " " + text_end).split())
-        
-        # --- DEFINING FEATURE DETECTORS start ---
-
-        def _has_any(keywords):
-            return any(k in full_sample for k in keywords)
+        text_end = text.tail(TYPOLOGY_SAMPLE).lower()
+        # hits of the typology keyword categories in both segments (whitespace runs as single spaces)
+        hits = self.matcher.count(" ".join((text_start + " " + text_end).split()), categories=("BRIEF", "PROMO", "PROJECT"))
+
+        return {
+            # headers for main scientific sections
+            "has_references": bool(self.section_patterns["references"].search(text_end)),
+            "has_sci_sections": bool(self.section_patterns["scientific"].search(text_start)),
+            "has_toc": bool(self.section_patterns["toc"].search(text_start)),
+            "has_version": "version" in text_start,
+            "brief_hit": hits["BRIEF"] > 0,
+            "promo_hit": hits["PROMO"] > 0,
+            "project_hit": hits["PROJECT"] > 0,
+        }
+
+    def _classify_typology(self, signals: dict, stats: dict) -> str:
+        """Preliminarily determines document category based on structural hints and patterns."""
+        num_pages = stats.get("num_pages", 0)
 
         # ** SCIENTIFIC **
-        # headers for main scientific sections
-        has_ref = bool(re.search(r"(?m)^\s*(references|bibliography)\s*$", text_end))
-        has_sci_sections = bool(re.search(r"(?m)^\s*(abstract|introduction|methodology)\s*$", text_start))        
-        if has_ref and has_sci_sections:
+        if signals["has_references"] and signals["has_sci_sections"]:
             return "SCIENTIFIC / TECHNICAL PAPER"
 
         # ** BRIEFS AND ABSTRACTS**
@@ -165,19 +283,19 @@ class DocPdf(Document):
         # grant agreement info
         # template-based
         # they usually have policy brief/recommendations/so on in their title
-        is_brief = _has_any(KEYWORDS["BRIEF"])
+        is_brief = signals["brief_hit"]
         if num_pages <= MAX_BRIEF_PAGES and is_brief:
             return "POLICY BRIEF / PRACTICE ABSTRACT"
 
         # ** PROMOS ** very short docs
-        is_promo = _has_any(KEYWORDS["PROMO"])
+        is_promo = signals["promo_hit"]
         if num_pages <= MAX_PROMO_PAGES and is_promo:
             return "PROMOTIONAL / NEWSLETTER"
 
         # ** REPORTS & BOOKS ** also guides and deliverables as a whole
-        has_toc = bool(re.search(r"(?m)^\s*(table of contents|contents|index)\s*$", text_start))
-        is_project = _has_any(KEYWORDS["PROJECT"]) or has_toc
-        if is_project or (num_pages >= MIN_DELIVERABLE_PAGES and (has_toc or "version" in text_start)):
+        has_toc = signals["has_toc"]
+        is_project = signals["project_hit"] or has_toc
+        if is_project or (num_pages >= MIN_DELIVERABLE_PAGES and (has_toc or signals["has_version"])):
             return "PROJECT DELIVERABLE" 
 
 
@@ -188,70 +306,141 @@ class DocPdf(Document):
         # final fail
         return "UNKNOWN"
         
+    def _prescreened(self, stats: dict, stages: dict) -> DocQuality:
+        """Invalid document, rejected before any text was extracted."""
+        return DocQuality(
+            is_struct_valid=False,
+            metadata={},
+            diagnostics={
+                "diagnose": {"prescreen": stats.pop("prescreen_detail")},
+                "stats": stats, "score": 0,
+                "features": self._rejected_features(stats, "prescreen"),
+                "stages": stages
+            }
+        )
+
+    def _over_budget(self, error: BudgetExceeded, stats: dict) -> DocQuality:
+        """Invalid document: it could not be parsed within its budget."""
+        print(f"    > Warning: document over its parsing budget ({error})")
+        features = self._rejected_features(stats, "budget")
+        stats = {k: stats[k] for k in ("num_pages", "bytes", "has_images") if k in stats}
+        return DocQuality(
+            is_struct_valid=False,
+            metadata={},
+            diagnostics={"diagnose": {"budget_exceeded": str(error)}, "stats": stats, "score": 0, "features": features}
+        )
+
     # ---------------------------------------------------------------------------------------
     # structural validity diagnosis
+
+    def _features(self, signals: dict, stats: dict, score: float, struct_valid: bool, metadata_ok: Optional[bool], partial: bool = False) -> dict:
+        """Flat record of everything the typology and score were computed from, plus the verdicts."""
+        headers = stats.get("headers", {})
+        return {
+            "num_pages": stats["num_pages"],
+            "bytes": stats["bytes"],
+            "text_len": stats.get("text_len", 0),
+            "avg_line_len": stats.get("avg_line_len", 0),
+            "has_title": bool(headers.get("title")),
+            "has_subtitle": bool(headers.get("subtitle")),
+            "has_funding": stats.get("keyword_hits", {}).get("FUNDING", 0) > 0,
+            **signals,
+            "type": stats["type"],
+            "score": score,
+            "struct_valid": struct_valid,
+            "metadata_ok": metadata_ok, # None: metadata never extracted
+            "partial_text": partial,    # early exit: text stats of the first/last pages only
+            "short_circuit": None,      # why it was rejected before being scored, if it was (prescreen, budget)
+        }
+
+    def _rejected_features(self, stats: dict, reason: str) -> dict:
+        """Features of a document rejected before being scored, for a given {reason}: no text, no signals."""
+        stats = {"type": "UNKNOWN", **stats}
+        features = self._features(self._typology_signals(LazyPdfText()), stats, 0, False, None)
+        features["short_circuit"] = reason
+        return features
+
+    def _early_decision(self, text: LazyPdfText, stats: dict, typology: str) -> Optional[tuple[int, dict, dict]]:
+        """
+        Scores the document from the pages extracted so far (leading and trailing ones), and returns
+        that diagnosis if no amount of extra text could change the verdict; None if the middle pages are needed.
+        """
+        # the title is searched in the first lines: they must all be extracted
+        text.head(0, min_lines=TITLE_SCAN_LINES)
+        if text.complete:
+            return None # nothing left to skip
+        score, diagnose, partial_stats = self._diagnose(text.partial(), dict(stats), typology)
+        if typology == "UNKNOWN":
+            return score, diagnose, partial_stats
+
+        # criteria that more text could still flip:
+        # line length (either way), funding statement and text density (only to valid)
+        line_point = 1 if partial_stats["avg_line_len"] > LINE_LEN else 0
+        lowest = score - line_point
+        highest = lowest + 1
+        if "funding_check" not in diagnose:
+            highest += 1
+        if partial_stats["text_len"] <= MIN_TEXT_LEN:
+            highest += 2
+        if typology in BIG_TYPES and partial_stats["text_len"] <= MAX_TEXT_LEN:
+            highest += 1
+
+        # clear reject
+        if highest < MIN_SCORE:
+            return score, diagnose, partial_stats
+
+        if lowest < MIN_SCORE:
+            return None
+
+        # clear accept, once enough pages are extracted to pass the sparse-content check
+        # (more text only raises the score: the missing pages are extracted in order until then)
+        num_pages = stats["num_pages"]
+        while num_pages > 2 and partial_stats["text_len"] < AVG_CHARS * num_pages:
+            if text.complete:
+                return None
+            deficit = AVG_CHARS * num_pages - partial_stats["text_len"]
+            for start, stop in text.missing_ranges():
+                for i in range(start, stop):
+                    deficit -= len(text.page(i)) + 1
+                    if deficit <= 0:
+                        break
+                if deficit <= 0:
+                    break
+            score, diagnose, partial_stats = self._diagnose(text.partial(), dict(stats), typology)
+
+        return score, diagnose, partial_stats
     
     def _diagnose(self, text: str, stats: dict, typology: str) -> tuple[int, dict, dict]:
         """Typology-based analysis ensuring consistency with process() and constants."""
         score = 0
         diagnose = {}
         
-        headers = self._extract_titles(text)
-        stats["headers"] = headers 
-        
-        clean_text = headers["clean_text"]
-        text_len = len(clean_text)
-        lines = clean_text.splitlines()
-        
-        avg_line_len = (sum(len(l) for l in lines) / len(lines)) if lines else 0
+        # a single walk over the text: size, lines, title candidates, funding keywords (the only ones scored here)
+        scanned = textstats.scan(text, head_lines=TITLE_SCAN_LINES, matcher=self.matcher, categories=("FUNDING",))
+        text_len = scanned.text_len
+        avg_line_len = scanned.avg_line_len
         
-        if "clean_text" in headers:
-            del headers["clean_text"] # so as not to appear in output
-
-        stats["headers"] = headers 
+        headers = self._extract_titles(scanned.head_lines)
+        stats["headers"] = headers
         stats.update({
             "text_len": text_len,
-            "avg_line_len": round(avg_line_len, 2),
-            "num_lines": len(lines)
+            "avg_line_len": avg_line_len, # (rounded in the results, see process)
+            "num_lines": scanned.num_lines,
+            "keyword_hits": dict(scanned.keyword_hits)
         })
         
         # --- TYPOLOGY-BASED SCORING ---
         
         # ** PAGE COUNT **
         pg_count = stats["num_pages"]
+        score += self._page_points(typology, pg_count, diagnose)
         
-        if "PROMOTIONAL" in typology:
-            if pg_count <= MAX_PROMO_PAGES: score += 2 
-            else: diagnose["typology_mismatch"] = f"promotional material too long (>{MAX_PROMO_PAGES} pages)"
-            
-        elif typology == "SCIENTIFIC / TECHNICAL PAPER":
-            if pg_count >= MIN_SCIENTIFIC_PAGES: score += 2
-            else: diagnose["typology_mismatch"] = f"scientific paper too short (<{MIN_SCIENTIFIC_PAGES} pages)"
-            
-            if pg_count > MAX_SCIENTIFIC_PAGES:
-                # warning only (score penalty), not invalidation
-                score -= 1
-                diagnose["typology_warning"] = f"scientific paper unusually long (>{MAX_SCIENTIFIC_PAGES} pages)"
-                
-        elif typology == "POLICY BRIEF / PRACTICE ABSTRACT":
-            if pg_count <= MAX_BRIEF_PAGES: score += 2
-            else: diagnose["typology_mismatch"] = f"brief/abstract too long (>{MAX_BRIEF_PAGES} pages)"
-            
-        elif typology == "PROJECT DELIVERABLE":
-            if pg_count >= MIN_DELIVERABLE_PAGES: score += 2
-            else: diagnose["typology_mismatch"] = f"deliverable too short (<{MIN_DELIVERABLE_PAGES} pages)"
-            
-        elif typology == "PROJECT REPORT":
-            if pg_count >= MIN_REPORT_PAGES: score += 2
-            else: diagnose["typology_mismatch"] = f"volume/report too small (<{MIN_REPORT_PAGES} pages)"
-            
-        elif typology == "UNKNOWN":
+        if typology == "UNKNOWN":
             diagnose["typology"] = "unknown document structure"
             return 0, diagnose, stats
 
         # ** FUNDING STATEMENT **
-        text_lower = text.lower()
-        if any(k in text_lower for k in KEYWORDS["FUNDING"]):
+        if scanned.keyword_hits["FUNDING"]:
             score += 1
             diagnose["funding_check"] = "valid EU Funding statement found"
 
@@ -265,7 +454,7 @@ class DocPdf(Document):
         if text_len > MIN_TEXT_LEN:
             score += 2
             # bonus for big documents with a lot of text
-            if typology in ["SCIENTIFIC / TECHNICAL PAPER", "PROJECT REPORT", "PROJECT DELIVERABLE"] and text_len > MAX_TEXT_LEN:
+            if typology in BIG_TYPES and text_len > MAX_TEXT_LEN:
                 score += 1
         else:
             diagnose["text_density"] = "not enough text content"
@@ -285,67 +474,233 @@ class DocPdf(Document):
 
         return score, diagnose, stats
 
+    def _page_points(self, typology: str, pg_count: int, diagnose: dict) -> int:
+        """Points of the page count, for a given typology (and why it got none)."""
+        points = 0
+        if "PROMOTIONAL" in typology:
+            if pg_count <= MAX_PROMO_PAGES: points += 2 
+            else: diagnose["typology_mismatch"] = f"promotional material too long (>{MAX_PROMO_PAGES} pages)"
+
+        elif typology == "SCIENTIFIC / TECHNICAL PAPER":
+            if pg_count >= MIN_SCIENTIFIC_PAGES: points += 2
+            else: diagnose["typology_mismatch"] = f"scientific paper too short (<{MIN_SCIENTIFIC_PAGES} pages)"
+
+            if pg_count > MAX_SCIENTIFIC_PAGES:
+                # warning only (score penalty), not invalidation
+                points -= 1
+                diagnose["typology_warning"] = f"scientific paper unusually long (>{MAX_SCIENTIFIC_PAGES} pages)"
+
+        elif typology == "POLICY BRIEF / PRACTICE ABSTRACT":
+            if pg_count <= MAX_BRIEF_PAGES: points += 2
+            else: diagnose["typology_mismatch"] = f"brief/abstract too long (>{MAX_BRIEF_PAGES} pages)"
+
+        elif typology == "PROJECT DELIVERABLE":
+            if pg_count >= MIN_DELIVERABLE_PAGES: points += 2
+            else: diagnose["typology_mismatch"] = f"deliverable too short (<{MIN_DELIVERABLE_PAGES} pages)"
+
+        elif typology == "PROJECT REPORT":
+            if pg_count >= MIN_REPORT_PAGES: points += 2
+            else: diagnose["typology_mismatch"] = f"volume/report too small (<{MIN_REPORT_PAGES} pages)"
+        return points
+
     # ---------------------------------------------------------------------------------------
     # working on actual physical properties of the document
 
-    def _read(self, file: IO) -> tuple[str, dict]:
-        """Reads PDF safely."""
+    def _read(self, file: IO, budget: PdfBudget = None, stages: dict = None, content_hash: Optional[str] = None) -> tuple[Optional[LazyPdfText], dict]:
+        """
+        Reads PDF safely (or its cached text). Its text is only extracted when asked for, within {budget}.
+        Documents rejected by the pre-screen have no text (None), their stats say which check fired.
+        The contents are only hashed (to look the text up) if their {content_hash} is not known yet.
+        """
+        stages = {} if stages is None else stages
+        clock = time.perf_counter()
+        key = content_hash or (TextCache.key(file) if self.text_cache is not None else None)
+        cached = self.text_cache.load(key) if key and self.text_cache is not None else None
+        if cached:
+            pages, stats = cached
+            # (sidecars of documents that were unreadable then, or are now out of reach)
+            if not stats["num_pages"]:
+                check, detail = "no_pages", "no readable pages"
+            else:
+                check, detail = "score_bound", self._score_bound_check(stats["num_pages"], stats["bytes"])
+            stages["prescreen"] = time.perf_counter() - clock
+            if detail:
+                return None, {"num_pages": stats["num_pages"], "bytes": stats["bytes"], "prescreen": check, "prescreen_detail": f"{check}: {detail}"}
+            if budget is not None:
+                budget.check_pages(stats["num_pages"])
+            # pages not extracted by the run that cached it are extracted from the file, if needed
+            doc_text = LazyPdfText(pages=pages, open_reader=lambda: self.backend(file), budget=budget)
+            doc_text.key = key
+            return doc_text, stats
+
+        # cheap checks first: header, size, page tree root
+        screen = self.prescreen.check(file)
+        if not screen.rejected:
+            detail = self._score_bound_check(screen.num_pages, screen.size)
+            if detail:
+                screen.rejected, screen.detail = "score_bound", detail
+        stages["prescreen"] = time.perf_counter() - clock
+        if screen.rejected:
+            return None, {"num_pages": screen.num_pages, "bytes": screen.size, "prescreen": screen.rejected, "prescreen_detail": f"{screen.rejected}: {screen.detail}"}
+
+        doc_text, stats = self._read_pdf(file, budget, screen.reader)
+        doc_text.key = key
+        doc_text.new_pages = 1 # stored even if no page is ever extracted
+        return doc_text, stats
+
+    def _score_bound_check(self, num_pages: int, size: int) -> Optional[str]:
+        """
+        Best score a document could reach with its page count and size, whatever its text turns out to be:
+        the reasons it is out of reach (None if it is not).
+        """
+        # typologies it could be assigned (by its keywords/sections) with that many pages
+        reachable = ["SCIENTIFIC / TECHNICAL PAPER", "PROJECT DELIVERABLE"]
+        if num_pages <= MAX_BRIEF_PAGES: reachable.append("POLICY BRIEF / PRACTICE ABSTRACT")
+        if num_pages <= MAX_PROMO_PAGES: reachable += ["PROMOTIONAL / NEWSLETTER", "PROMOTIONAL / FLYER"]
+        if num_pages > MIN_REPORT_PAGES: reachable.append("PROJECT REPORT")
+        page_points = max(self._page_points(t, num_pages, {}) + (1 if t in BIG_TYPES else 0) for t in reachable)
+
+        # + funding, density, line length, title and subtitle at best
+        best = page_points + (1 if size > MIN_BYTES else 0) + 1 + 2 + 1 + 1.5
+        if best >= MIN_SCORE:
+            return None
+        return f"at most {best} points with {num_pages} pages and {size} bytes (min. {MIN_SCORE})"
+
+    def _cache_text(self, text: LazyPdfText, stats: dict) -> None:
+        """Stores the pages extracted from a document (and its raw stats), if there are new ones."""
+        if self.text_cache is None or text.key is None or not text.new_pages:
+            return
+        try:
+            self.text_cache.store(text.key, text.pages, stats)
+        except OSError as e:
+            print(f"    > Warning: could not cache the text of {text.key}: {e}")
+
+    def _read_pdf(self, file: IO, budget: PdfBudget = None, reader: PdfBackend = None) -> tuple[LazyPdfText, dict]:
+        """Reads PDF safely (or reuses the {reader} the pre-screen opened). Its text is only extracted when asked for, within {budget}."""
         try:
             file.seek(0)
             header = file.read(5)
             file.seek(0)
             
             if b"%PDF-" not in header:
-                return "", {"num_pages": 0, "bytes": 0}
+                return LazyPdfText(), {"num_pages": 0, "bytes": 0}
 
             file.seek(0, 2)
             size = file.tell()
             file.seek(0)
             
-            reader = PdfReader(file)
+            reader = reader or self.backend(file)
             if reader.is_encrypted:
-                return "", {"num_pages": 0, "bytes": size}
+                return LazyPdfText(), {"num_pages": 0, "bytes": size}
 
-            text_parts = []
-            has_images = False # TODO: check image extraction
-            
-            for p in reader.pages:
-                extracted = p.extract_text()
-                if extracted:
-                    text_parts.append(extracted)
-                if '/XObject' in p.get('/Resources', {}):
-                    has_images = True
+            # too many pages: not worth walking them
+            if budget is not None:
+                budget.check_pages(reader.num_pages)
+
+            has_images = reader.has_images()
             
-            text = "\n".join(text_parts)
-            return text, {"num_pages": len(reader.pages), "bytes": size, "has_images": has_images}
+            return LazyPdfText(reader, budget=budget), {"num_pages": reader.num_pages, "bytes": size, "has_images": has_images}
 
+        except BudgetExceeded:
+            raise
         except Exception:
-            return "", {"num_pages": 0, "bytes": 0}
+            return LazyPdfText(), {"num_pages": 0, "bytes": 0}
+
+    def _extract_all(self, text: LazyPdfText, file: IO) -> None:
+        """Extracts the pages of the document not extracted yet, in parallel if there are many."""
+        missing = sum(stop - start for start, stop in text.missing_ranges())
+        if self._page_parallel(missing):
+            self._extract_parallel(text, file)
+        text.extract_missing()
+
+    def _page_parallel(self, num_pages: int) -> bool:
+        """Whether a document is big enough for its pages to be extracted by several processes."""
+        return self.config.pdf_page_workers > 1 and num_pages > self.config.pdf_parallel_page_threshold
+
+    def _extract_parallel(self, text: LazyPdfText, file: IO) -> None:
+        """Splits the missing pages of a large PDF into contiguous ranges extracted in parallel (those that complete, see _extract_all)."""
+        with self._page_pool_lock:
+            if self._page_pool is None:
+                self._page_pool = ProcessPoolExecutor(max_workers=self.config.pdf_page_workers)
+
+        # workers reopen the document: from disk when it is a real file, from its bytes otherwise
+        path = getattr(file, "name", None)
+        if isinstance(path, str) and os.path.isfile(path):
+            source = path
+        else:
+            file.seek(0)
+            source = file.read()
 
+        missing = text.missing_ranges()
+        num_pages = sum(stop - start for start, stop in missing)
+        chunk = max(1, num_pages // (self.config.pdf_page_workers * 2)) # a bit more ranges than workers, to even out slow pages
 
-    def _extract_titles(self, text: str) -> Dict[str, str]:
-        """More robust extraction of title/subtitle ignoring noise
-        (rather than text[0]....... very lazy).
+        # the bytes left are shared between the ranges, and the deadline is the same: more workers do not make the budget bigger
+        ranges = [(chunk_start, min(stop, chunk_start + chunk)) for start, stop in missing for chunk_start in range(start, stop, chunk)]
+        budget = text.budget.remaining(share=len(ranges)) if text.budget is not None else None
+
+        futures = {}
+        for chunk_start, chunk_stop in ranges:
+            futures[chunk_start] = self._page_pool.submit(extract_page_range, source, chunk_start, chunk_stop, budget, self.backend.name)
+
+        # a range going over its share is no verdict: the pages left are then extracted here (see _extract_all),
+        # within what is left of the budget of the whole document, so that the verdict is the same as without workers
+        over_share = False
+        try:
+            for chunk_start, future in futures.items():
+                if over_share and not future.done():
+                    future.cancel()
+                    continue
+                try:
+                    texts, num_bytes = future.result()
+                except BudgetExceeded:
+                    over_share = True
+                    continue
+                text.fill({chunk_start + i: t for i, t in enumerate(texts)})
+                if text.budget is not None:
+                    text.budget.add_bytes(num_bytes)
+        except BudgetExceeded:
+            for future in futures.values():
+                future.cancel()
+            raise
+
+    def _excerpt(self, text: LazyPdfText, headers: dict) -> str:
+        """
+        Part of the text sent for metadata extraction instead of the whole file (see metadata_payload):
+        title and subtitle found, then the start and the end of the text, within metadata_excerpt_tokens.
         """
-        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        budget = self.config.metadata_excerpt_tokens * EXCERPT_CHARS_PER_TOKEN
+        lines = [f"{name}: {headers[name]}" for name in ("title", "subtitle") if headers.get(name)]
+        budget = max(0, budget - sum(len(l) + 1 for l in lines))
+
+        length = sum(len(p) + 1 for p in text.pages if p)
+        if text.complete and length <= budget:
+            body = [text.partial()]
+        else:
+            # more of the start (abstract, summary...) than of the end (conclusions, contact...)
+            head = budget * 2 // 3
+            body = [text.head(head), "[...]", text.tail(budget - head)]
+        return "\n".join(lines + [""] + body if lines else body)
 
+    def _extract_titles(self, lines: List[str]) -> Dict[str, str]:
+        """More robust extraction of title/subtitle ignoring noise
+        (rather than text[0]....... very lazy), from the first non-empty (stripped) lines.
+        """
         title = None
         subtitle = None
         
-        scan_limit = min(len(lines), 20) 
+        scan_limit = min(len(lines), TITLE_SCAN_LINES) 
         title_i = -1
         
         for i in range(scan_limit):
             line = lines[i]
             
             # noise: (page numbers, URLs)
-            if any(p.search(line) for p in self.noise_patterns): continue
+            # EU funding
+            if self.matcher.line_class(line): continue
             
             # artifacts: (tiny lines)
             if len(line) < 3: continue
-
-            # EU funding
-            if any(p.search(line) for p in self.skip_patterns): continue
             
             # title
             if not title:
@@ -361,4 +716,4 @@ class DocPdf(Document):
                         subtitle = line
                         break
 
-        return {"clean_text": text.strip(), "title": title, "subtitle": subtitle}
+        return {"title": title, "subtitle": subtitle}
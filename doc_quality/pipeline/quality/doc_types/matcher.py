@@ -0,0 +1,52 @@
+# matcher.py
+# /compiled multi-pattern matcher for keywords and noise lines/
+# adriana r.f.
+# feb-2026
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+class PatternMatcher:
+    """
+    Keyword categories and line classes (noise, skip...) compiled once, to count the hits of any of them.
+    Keywords are literal and case-insensitive (their spaces are single spaces, as in the text checks they replace):
+    they are counted on the lowered text with str.count, which is far faster in CPython than any one-pass
+    regex over it (an alternation is tried at every position). Line classes are matched per (stripped) line,
+    with one combined regex.
+    """
+
+    def __init__(self, keywords: Dict[str, List[str]], line_patterns: Dict[str, List[str]]):
+        self.categories = list(keywords)
+        self.line_classes = list(line_patterns)
+        self._keywords = {c: sorted({k.lower() for k in ks}) for c, ks in keywords.items()}
+
+        # lines (stripped) -> class
+        self._line_re = re.compile(
+            "|".join(f"(?P<{c}>{'|'.join(f'(?:{p})' for p in ps)})" for c, ps in line_patterns.items()),
+            re.IGNORECASE,
+        )
+
+    def count(self, text: str, start: int = 0, end: Optional[int] = None, categories: Optional[Iterable[str]] = None) -> Counter:
+        """
+        Hits of some keyword {categories} (all of them if None) in text[start:end]: occurrences of each of its keywords
+        (a keyword contained in another one is counted within it too, e.g. "news" in "newsletter").
+        Every keyword is one pass over the text: only ask for the categories needed.
+        """
+        lowered = text[start:end].lower()
+        categories = self.categories if categories is None else categories
+        return Counter({c: sum(lowered.count(k) for k in self._keywords[c]) for c in categories})
+
+    def count_lines(self, lines: Iterable[str]) -> Counter:
+        """Hits of every line class among some (stripped) lines."""
+        hits = Counter({name: 0 for name in self.line_classes})
+        for line in lines:
+            name = self.line_class(line)
+            if name:
+                hits[name] += 1
+        return hits
+
+    def line_class(self, line: str) -> Optional[str]:
+        """Class of a stripped line (noise, skip...), None if it is none of them."""
+        m = self._line_re.search(line)
+        return m.lastgroup if m else None
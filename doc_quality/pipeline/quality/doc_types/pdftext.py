@@ -0,0 +1,115 @@
+# pdftext.py
+# /lazy, page-by-page text of a PDF document/
+# adriana r.f.
+# feb-2026
+
+from typing import Callable, List, Optional, Tuple, Union, Dict
+from .budget import PdfBudget, BudgetExceeded
+from .backends import PdfBackend, get_backend
+
+def extract_page_range(source: Union[str, bytes], start: int, stop: int, budget: Optional[PdfBudget] = None,
+                       backend: str = "pypdf") -> Tuple[List[str], int]:
+    """Extracts the text of pages [start, stop) of a PDF (path or raw bytes) with a given {backend}, e.g. in a worker process.
+    Returns the texts and the decompressed bytes they took."""
+    # (the deadline of the budget is on the monotonic clock, the same in this process)
+    reader = get_backend(backend)(source)
+    texts = [reader.page_text(i, budget) for i in range(start, min(stop, reader.num_pages))]
+    return texts, budget.bytes if budget is not None else 0
+
+class LazyPdfText:
+    """
+    Text of a PDF, extracted page by page and only when needed.
+    The full text is the non-empty page texts joined by newlines (as always extracted before),
+    but its head and tail can be read from the first and last pages alone.
+    """
+
+    def __init__(self, reader: Optional[PdfBackend] = None, pages: Optional[List[Optional[str]]] = None,
+                 open_reader: Optional[Callable[[], PdfBackend]] = None, budget: Optional[PdfBudget] = None):
+        """Either from an open {reader}, or from {pages} already extracted (e.g. cached),
+        the missing ones being extracted from the reader returned by {open_reader}, if ever needed.
+        Pages are extracted within {budget}, if any (raising BudgetExceeded)."""
+        self.reader = reader
+        self.open_reader = open_reader
+        self.budget = budget
+        if pages is not None:
+            self.pages: List[Optional[str]] = list(pages)
+        else:
+            self.pages = [None] * (reader.num_pages if reader is not None else 0)
+        self.num_pages = len(self.pages)
+        self.new_pages = 0 # extracted since built
+        self.key: Optional[str] = None # content hash of the document, if cached
+
+    @property
+    def extracted_pages(self) -> int:
+        return sum(1 for p in self.pages if p is not None)
+
+    @property
+    def complete(self) -> bool:
+        return self.extracted_pages == self.num_pages
+
+    def page(self, i: int) -> str:
+        if self.pages[i] is None:
+            if self.reader is None:
+                self.reader = self.open_reader()
+            self.pages[i] = self.reader.page_text(i, self.budget)
+            self.new_pages += 1
+        return self.pages[i]
+
+    def fill(self, texts: Dict[int, str]) -> None:
+        """Sets the text of pages extracted elsewhere (e.g. by worker processes)."""
+        for i, text in texts.items():
+            self.pages[i] = text
+        self.new_pages += len(texts)
+
+    def missing_ranges(self) -> List[Tuple[int, int]]:
+        """Contiguous [start, stop) ranges of pages not extracted yet."""
+        ranges, start = [], None
+        for i, text in enumerate(self.pages + [""]):
+            if text is None and start is None:
+                start = i
+            elif text is not None and start is not None:
+                ranges.append((start, i))
+                start = None
+        return ranges
+
+    # ---------------------------------------------------------------------------------------
+
+    def head(self, n_chars: int, min_lines: int = 0) -> str:
+        """First {n_chars} characters of the full text, extracting leading pages only.
+        Also makes sure that the leading pages hold at least {min_lines} non-empty lines."""
+        parts, length, lines = [], 0, 0
+        for i in range(self.num_pages):
+            if length >= n_chars and lines >= min_lines:
+                break
+            text = self.page(i)
+            if text:
+                parts.append(text)
+                length += len(text) + 1
+                lines += sum(1 for l in text.splitlines() if l.strip())
+        return "\n".join(parts)[:n_chars]
+
+    def tail(self, n_chars: int) -> str:
+        """Last {n_chars} characters of the full text, extracting trailing pages only."""
+        parts, length = [], 0
+        for i in reversed(range(self.num_pages)):
+            if length >= n_chars:
+                break
+            text = self.page(i)
+            if text:
+                parts.append(text)
+                length += len(text) + 1
+        return "\n".join(reversed(parts))[-n_chars:] if n_chars else ""
+
+    def partial(self) -> str:
+        """Text of the pages extracted so far, in page order."""
+        return "\n".join(p for p in self.pages if p)
+
+    def extract_missing(self) -> None:
+        """Extracts every page not extracted yet."""
+        for i in range(self.num_pages):
+            self.page(i)
+
+    def full(self) -> str:
+        """Full text, extracting every page not extracted yet."""
+        self.extract_missing()
+        return self.partial()
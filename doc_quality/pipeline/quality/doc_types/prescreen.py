@@ -0,0 +1,88 @@
+# prescreen.py
+# /cheap checks of a PDF before any text is extracted/
+# adriana r.f.
+# feb-2026
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import IO, List, Optional, Type
+from .backends import PdfBackend, PypdfBackend
+
+PDF_MAGIC = b"%PDF-"
+
+@dataclass
+class ScreenResult:
+    """Physical properties of a document, read from its header, size and xref/page tree only."""
+    rejected: Optional[str] = None  # check that fired (None: passed)
+    detail: str = ""
+    size: int = 0
+    num_pages: int = 0
+    reader: Optional[PdfBackend] = None # opened document, reused to extract the text
+
+class PreScreen:
+    """
+    Fast pre-screen of a PDF: magic bytes, encryption, size and page count (from the page tree root,
+    without walking the pages). Anything that cannot be a readable PDF is rejected here;
+    the score bound (see DocPdf._score_bound_check) is applied on top of these properties.
+    """
+
+    def __init__(self, backend: Type[PdfBackend] = PypdfBackend):
+        self.backend = backend
+
+    def check(self, file: IO) -> ScreenResult:
+        file.seek(0)
+        header = file.read(len(PDF_MAGIC))
+        file.seek(0, 2)
+        size = file.tell()
+        file.seek(0)
+
+        if PDF_MAGIC not in header:
+            return ScreenResult("not_pdf", f"no PDF magic bytes (starts with {header!r})", size=size)
+
+        try:
+            reader = self.backend(file)
+            if reader.is_encrypted:
+                return ScreenResult("encrypted", "encrypted PDF", size=size)
+            num_pages = reader.declared_pages()
+        except Exception as e:
+            return ScreenResult("unreadable", f"broken xref/page tree ({e})", size=size)
+
+        if num_pages == 0:
+            return ScreenResult("no_pages", "PDF without pages", size=size)
+
+        return ScreenResult(size=size, num_pages=num_pages, reader=reader)
+
+class StageStats:
+    """Counters over a run: documents stopped by each pre-screen check, time spent in each stage and bytes sent for metadata extraction."""
+
+    def __init__(self):
+        self.documents = 0
+        self.checks = Counter()  # pre-screen check -> documents it rejected
+        self.seconds = Counter() # stage -> total seconds
+        self.extracted = 0       # documents whose text was extracted
+        self.payload = Counter() # bytes of the files posted for metadata extraction ("file") and actually sent ("sent")
+
+    def add(self, diagnostics: dict) -> None:
+        """Accounts for the structural diagnostics of a document (see DocPdf.process)."""
+        self.documents += 1
+        check = diagnostics.get("stats", {}).get("prescreen")
+        if check:
+            self.checks[check] += 1
+        stages = diagnostics.get("stages", {})
+        self.seconds.update(stages)
+        if "extraction" in stages:
+            self.extracted += 1
+        self.payload.update(diagnostics.get("payload", {}))
+
+    def summary(self) -> List[str]:
+        rejected = sum(self.checks.values())
+        lines = [f"Pre-screen rejected {rejected}/{self.documents} documents without extracting any text"
+                 + (f" ({', '.join(f'{c}: {n}' for c, n in self.checks.most_common())})" if rejected else "")]
+        lines.append("Time per stage: " + ", ".join(f"{stage} {secs:.1f}s" for stage, secs in self.seconds.items()))
+        if rejected and self.extracted:
+            saved = rejected * self.seconds["extraction"] / self.extracted
+            lines.append(f"Extraction time saved by the pre-screen: ~{saved:.1f}s")
+        if self.payload["file"]:
+            saved = 1 - self.payload["sent"] / self.payload["file"]
+            lines.append(f"Metadata payload: {self.payload['sent'] / 1e6:.1f}MB sent for {self.payload['file'] / 1e6:.1f}MB of documents ({saved:.0%} saved)")
+        return lines
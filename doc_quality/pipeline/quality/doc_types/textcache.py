@@ -0,0 +1,62 @@
+# textcache.py
+# /compressed sidecars of the text extracted from each document/
+# adriana r.f.
+# feb-2026
+
+import os
+import gzip
+import json
+import hashlib
+import tempfile
+from typing import IO, List, Optional, Tuple
+import pypdf
+
+# bump whenever the extracted text could change (extraction code, not scoring)
+EXTRACTOR_VERSION = f"pypdf-{getattr(pypdf, '__version__', 'unknown')}.1"
+
+class TextCache:
+    """
+    Text (per page) and raw stats extracted from a document, stored as a gzipped JSON sidecar
+    keyed by the hash of the file contents and the extractor version, so that rescoring the corpus
+    after a threshold change does not need to parse the PDFs again.
+    Pages that were never extracted (early exit) are stored as null and extracted on demand.
+    """
+
+    def __init__(self, cache_dir: str, version: str = EXTRACTOR_VERSION):
+        self.cache_dir = str(cache_dir)
+        self.version = version
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(file: IO, chunk_size: int = 1 << 20) -> str:
+        """Hash of the file contents."""
+        file.seek(0)
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+        file.seek(0)
+        return digest.hexdigest()
+
+    def load(self, key: str) -> Optional[Tuple[List[Optional[str]], dict]]:
+        """Pages and raw stats of a document, None if not cached (or unreadable)."""
+        try:
+            with gzip.open(self._path(key), "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, EOFError, ValueError):
+            return None # not cached, or torn by an interrupted run
+        return entry["pages"], entry["stats"]
+
+    def store(self, key: str, pages: List[Optional[str]], stats: dict) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # written aside then moved, so that concurrent workers never read half a sidecar
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump({"version": self.version, "stats": stats, "pages": pages}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    # ---------------------------------------------------------------------------------------
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{self.version}.json.gz")
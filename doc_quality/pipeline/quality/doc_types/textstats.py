@@ -0,0 +1,75 @@
+# textstats.py
+# /single-pass statistics of an extracted text/
+# adriana r.f.
+# feb-2026
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+from .matcher import PatternMatcher
+
+# every line boundary recognised by str.splitlines()
+LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+_BREAK_RE = re.compile(r"\r\n|[" + re.escape(LINE_BREAKS) + "]")
+_NON_SPACE_RE = re.compile(r"\S")
+
+@dataclass
+class TextStats:
+    """Size, line and keyword statistics of a text (as if computed on text.strip())."""
+    text_len: int = 0
+    num_lines: int = 0
+    avg_line_len: float = 0
+    head_lines: List[str] = field(default_factory=list) # first non-empty lines, stripped
+    keyword_hits: Counter = field(default_factory=Counter) # per keyword category asked for (whole text) / line class (head lines)
+
+def scan(text: str, head_lines: int = 20, matcher: Optional[PatternMatcher] = None,
+         categories: Optional[Iterable[str]] = None) -> TextStats:
+    """
+    Computes the statistics of the stripped text, walked within its strip bounds (no strip/splitlines).
+    The only copy made is the lowered text the keyword {categories} (all of them if None) are counted on, if a {matcher} is given.
+    """
+    # strip bounds
+    first = _NON_SPACE_RE.search(text)
+    if first is None:
+        return TextStats(keyword_hits=_hits(matcher, "", 0, 0, [], categories))
+    start, end = first.start(), len(text)
+    while text[end - 1].isspace():
+        end -= 1
+
+    # line breaks (a \r\n pair being a single one), counted at C speed
+    breaks = sum(text.count(c, start, end) for c in LINE_BREAKS)
+    crlf = text.count("\r\n", start, end)
+    num_lines = breaks - crlf + 1
+    text_len = end - start
+
+    # first non-empty lines (only the beginning of the text is walked)
+    lines, pos = [], start
+    for m in _BREAK_RE.finditer(text, start, end):
+        if len(lines) >= head_lines:
+            break
+        line = text[pos:m.start()].strip()
+        if line:
+            lines.append(line)
+        pos = m.end()
+    else:
+        line = text[pos:end].strip()
+        if line and len(lines) < head_lines:
+            lines.append(line)
+
+    return TextStats(
+        text_len=text_len,
+        num_lines=num_lines,
+        avg_line_len=(text_len - breaks) / num_lines, # line length excludes the breaks
+        head_lines=lines,
+        keyword_hits=_hits(matcher, text, start, end, lines, categories),
+    )
+
+def _hits(matcher: Optional[PatternMatcher], text: str, start: int, end: int, head_lines: List[str],
+          categories: Optional[Iterable[str]] = None) -> Counter:
+    """Keyword categories over the whole text, line classes (noise, skip...) over its first lines."""
+    if matcher is None:
+        return Counter()
+    hits = matcher.count(text, start, end, categories)
+    hits.update(matcher.count_lines(head_lines)) # (update keeps the zero counts, + would drop them)
+    return hits
@@ -0,0 +1,53 @@
+# features.py
+# /columnar store of the structural features of every processed document/
+# adriana r.f.
+# feb-2026
+
+import os
+from pathlib import Path
+from typing import Dict, Any, List
+import pandas as pd
+
+class FeatureStore:
+    """
+    One row per document with the structural features its typology and score were computed from
+    (see DocPdf._features), kept as a single columnar file (Parquet, or CSV by extension)
+    so that the whole corpus can be rescored at once (see rescore.py).
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self.rows: List[Dict[str, Any]] = []
+
+    def add(self, filename: str, features: Dict[str, Any]) -> None:
+        self.rows.append({"file": filename, **features})
+
+    def save(self) -> None:
+        """Merges the new rows into the store (a reprocessed document replaces its previous row)."""
+        if not self.rows:
+            return
+        new = pd.DataFrame(self.rows)
+        if os.path.exists(self.path):
+            old = self.load(self.path)
+            new = pd.concat([old[~old["file"].isin(new["file"])], new], ignore_index=True)
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        if self._is_parquet(self.path):
+            new.to_parquet(tmp_path, index=False)
+        else:
+            new.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+        self.rows = []
+
+    @classmethod
+    def load(cls, path: str) -> pd.DataFrame:
+        if cls._is_parquet(path):
+            return pd.read_parquet(path)
+        return pd.read_csv(path)
+
+    # ---------------------------------------------------------------------------------------
+
+    @staticmethod
+    def _is_parquet(path: str) -> bool:
+        return Path(path).suffix.lower() == ".parquet"
@@ -0,0 +1,126 @@
+# rescore.py
+# /vectorized rescoring of the whole corpus from its feature store/
+# adriana r.f.
+# feb-2026
+
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+from .doc_types import docpdf
+
+# heuristic thresholds of docpdf.py that can be tuned without reprocessing the documents
+THRESHOLDS = [
+    "MIN_SCORE", "MIN_BYTES", "MIN_TEXT_LEN", "MAX_TEXT_LEN", "AVG_CHARS", "LINE_LEN",
+    "MAX_BRIEF_PAGES", "MAX_SCIENTIFIC_PAGES", "MIN_SCIENTIFIC_PAGES",
+    "MIN_DELIVERABLE_PAGES", "MIN_REPORT_PAGES", "MAX_PROMO_PAGES",
+]
+
+def current_thresholds(overrides: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """Thresholds as currently defined in docpdf.py, with some of them overridden."""
+    thresholds = {name: getattr(docpdf, name) for name in THRESHOLDS}
+    for name, value in (overrides or {}).items():
+        if name not in thresholds:
+            raise ValueError(f"unknown threshold '{name}' (one of: {', '.join(THRESHOLDS)})")
+        thresholds[name] = value
+    return thresholds
+
+def rescore(features: pd.DataFrame, t: Dict[str, float]) -> pd.DataFrame:
+    """
+    Typology, score and verdicts of every document for the given thresholds:
+    the same rules as DocPdf._classify_typology/_diagnose/process, over whole columns at once.
+    """
+    pages = features["num_pages"].to_numpy()
+    text_len = features["text_len"].to_numpy()
+    flag = lambda name: features[name].to_numpy(dtype=bool)
+
+    # ** TYPOLOGY **
+    has_toc = flag("has_toc")
+    typology = np.select(
+        [
+            flag("has_references") & flag("has_sci_sections"),
+            (pages <= t["MAX_BRIEF_PAGES"]) & flag("brief_hit"),
+            (pages <= t["MAX_PROMO_PAGES"]) & flag("promo_hit"),
+            flag("project_hit") | has_toc | ((pages >= t["MIN_DELIVERABLE_PAGES"]) & (has_toc | flag("has_version"))),
+            pages > t["MIN_REPORT_PAGES"],
+            pages <= t["MAX_PROMO_PAGES"],
+        ],
+        [
+            "SCIENTIFIC / TECHNICAL PAPER", "POLICY BRIEF / PRACTICE ABSTRACT", "PROMOTIONAL / NEWSLETTER",
+            "PROJECT DELIVERABLE", "PROJECT REPORT", "PROMOTIONAL / FLYER",
+        ],
+        default="UNKNOWN",
+    )
+
+    # ** PAGE COUNT ** (per typology)
+    page_points = np.select(
+        [
+            np.char.startswith(typology.astype(str), "PROMOTIONAL"),
+            typology == "SCIENTIFIC / TECHNICAL PAPER",
+            typology == "POLICY BRIEF / PRACTICE ABSTRACT",
+            typology == "PROJECT DELIVERABLE",
+            typology == "PROJECT REPORT",
+        ],
+        [
+            2 * (pages <= t["MAX_PROMO_PAGES"]),
+            2 * (pages >= t["MIN_SCIENTIFIC_PAGES"]) - (pages > t["MAX_SCIENTIFIC_PAGES"]),
+            2 * (pages <= t["MAX_BRIEF_PAGES"]),
+            2 * (pages >= t["MIN_DELIVERABLE_PAGES"]),
+            2 * (pages >= t["MIN_REPORT_PAGES"]),
+        ],
+        default=0,
+    )
+
+    # ** FUNDING STATEMENT ** / ** FILE SIZE ** / ** TEXT DENSITY ** / ** LINE LENGTH ** / ** TITLE **
+    dense = text_len > t["MIN_TEXT_LEN"]
+    score = (
+        page_points
+        + flag("has_funding")
+        + (features["bytes"].to_numpy() > t["MIN_BYTES"])
+        + 2 * dense + (dense & np.isin(typology, docpdf.BIG_TYPES) & (text_len > t["MAX_TEXT_LEN"]))
+        + (features["avg_line_len"].to_numpy() > t["LINE_LEN"])
+        + flag("has_title") * (1 + 0.5 * flag("has_subtitle"))
+    )
+
+    # critical fails: unassigned type + extremely sparse document
+    unknown = typology == "UNKNOWN"
+    sparse = (pages > 2) & (text_len / np.maximum(1, pages) < t["AVG_CHARS"])
+    score = np.where(unknown | sparse, 0, score)
+    struct_valid = (score >= t["MIN_SCORE"]) & ~unknown & ~sparse
+
+    # rejected before being scored (pre-screen, parsing budget): no threshold changes that
+    rejected = _short_circuited(features)
+    typology = np.where(rejected, features["type"].to_numpy(), typology)
+    score = np.where(rejected, 0, score)
+    struct_valid &= ~rejected
+
+    return pd.DataFrame({
+        "file": features["file"].to_numpy(),
+        "type": typology,
+        "score": score,
+        "struct_valid": struct_valid,
+    })
+
+def flips(features: pd.DataFrame, rescored: pd.DataFrame) -> Dict[str, int]:
+    """How many documents change structural verdict (or typology) between the stored run and the rescored one."""
+    before = features["struct_valid"].to_numpy(dtype=bool)
+    after = rescored["struct_valid"].to_numpy()
+    # metadata is only extracted for structurally valid documents
+    metadata_ok = features["metadata_ok"]
+    never_extracted = metadata_ok.isna().to_numpy()
+    return {
+        "documents": len(features),
+        "valid_before": int(before.sum()),
+        "valid_after": int(after.sum()),
+        "to_valid": int((~before & after).sum()),
+        "to_invalid": int((before & ~after).sum()),
+        "to_valid_without_metadata": int((~before & after & never_extracted).sum()),
+        "typology_changes": int((features["type"].to_numpy() != rescored["type"].to_numpy()).sum()),
+        "partial_text": int(features["partial_text"].to_numpy(dtype=bool).sum()) if "partial_text" in features else 0,
+        "short_circuit": int(_short_circuited(features).sum()),
+    }
+
+def _short_circuited(features: pd.DataFrame) -> np.ndarray:
+    """Documents rejected before being scored (stores written before the column existed have none)."""
+    if "short_circuit" not in features:
+        return np.zeros(len(features), dtype=bool)
+    return features["short_circuit"].notna().to_numpy()
@@ -5,23 +5,18 @@
 
 import json
 from pathlib import Path
-from typing import List, Tuple, Dict, Any
+from typing import Iterator, List, Tuple, Dict, Any
 from bertopic import BERTopic
+from ..metadata.store import ResultStore
 
 def load_docs(input_dir: Path, metadata_fields: List[str], min_text_len: int = 10) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
-    """Loads extracted metadata text for specific fields."""
+    """Loads extracted metadata text for specific fields, from a result store or a directory of JSON files (see ResultStore.export)."""
     docs = []
     doc_ids = []
     meta = []
 
-    # only valid metadata in JSON format
-    files = list(input_dir.glob("*.json"))
-    print(f"    > [Topic modeling] Loading metadata texts from {len(files)} files...")
-
-    for f in files:
+    for name, data in _valid_records(Path(input_dir)):
         try:
-            data = json.loads(f.read_text(encoding="utf-8"))
-            
             # this is what will be passed for the model
             text_parts = []
             record = {}
@@ -37,7 +32,7 @@ def load_docs(input_dir: Path, metadata_fields: List[str], min_text_len: int = 1
 
             if len(text) > min_text_len:
                 docs.append(text)
-                doc_ids.append(f.name)
+                doc_ids.append(name)
                 meta.append(record)
 
         except:
@@ -45,6 +40,27 @@ def load_docs(input_dir: Path, metadata_fields: List[str], min_text_len: int = 1
 
     return docs, doc_ids, meta
 
+def _valid_records(input_dir: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(JSON file name, record) of every valid document."""
+    if ResultStore.exists(input_dir):
+        store = ResultStore(input_dir, read_only=True)
+        print(f"    > [Topic modeling] Streaming metadata texts of the valid documents out of {len(store)} stored...")
+        try:
+            for key, record in store.records(valid=True):
+                yield f"{key}.json", record
+        finally:
+            store.close()
+        return
+
+    # only valid metadata in JSON format
+    files = list(input_dir.glob("*.json"))
+    print(f"    > [Topic modeling] Loading metadata texts from {len(files)} files...")
+    for f in files:
+        try:
+            yield f.name, json.loads(f.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+
 def save_model(topic_model: BERTopic, output_dir: Path, docs: List[str], filenames: List[str]):
     """Saves trained BERTopic model and metadata CSVs."""
     
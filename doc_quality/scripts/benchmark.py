@@ -0,0 +1,63 @@
+# benchmark.py
+# /script for benchmarking the PDF text-extraction backends/
+# adriana r.f.
+# feb-2026
+
+import argparse
+from pathlib import Path
+from doc_quality.config.settings import Settings
+from doc_quality.pipeline.quality.doc_types.backends import BACKENDS, available_backends
+from doc_quality.pipeline.quality.benchmark import REFERENCE, benchmark, differences
+from doc_quality.pipeline.loader.corpus import iter_documents, reservoir_sample
+
+def main(args, config: Settings):
+    print(f"[DOCUMENT QUALITY APP] PDF backend benchmark")
+    print(f" > Input dir:   {args.input_dir}")
+
+    installed = available_backends()
+    backends = [b.strip() for b in args.backends.split(",")] if args.backends else installed
+    for name in backends:
+        if name not in BACKENDS:
+            raise ValueError(f"unknown PDF backend '{name}' (one of: {', '.join(BACKENDS)})")
+    missing = [b for b in backends if b not in installed]
+    if missing:
+        print(f"    > Warning: not installed, skipped: {', '.join(missing)}")
+    # the reference always runs first: every other backend is compared with it
+    backends = [REFERENCE] + [b for b in backends if b in installed and b != REFERENCE]
+    print(f" > Backends:   {', '.join(backends)}")
+
+    if args.n > 0:
+        files, _ = reservoir_sample(iter_documents(args.input_dir), args.n, args.seed)
+    else:
+        files = sorted(iter_documents(args.input_dir), key=lambda p: p.name)
+    files = [str(f) for f in files]
+    print(f" > Sample:   {len(files)} documents")
+    if not files:
+        return
+
+    results = benchmark(files, backends, config)
+    reference = results[0]
+    diffs = [differences(reference, result) for result in results]
+
+    print(f"[BENCHMARK] {'backend':<12}{'pages':>8}{'pages/s':>10}{'peak RSS':>12}{'valid':>8}{'verdict diffs':>15}{'type diffs':>12}")
+    for result, diff in zip(results, diffs):
+        print(f"[BENCHMARK] {result['backend']:<12}{result['pages']:>8}{result['pages_per_sec']:>10.1f}"
+              f"{result['peak_rss_mb']:>9.0f} MB{result['valid']:>8}"
+              f"{diff['verdict_changes']:>8} ({diff['verdict_changes'] / len(files):.0%}){diff['typology_changes']:>12}")
+
+    for result, diff in zip(results[1:], diffs[1:]):
+        if diff["verdict_changes"]:
+            print(f"[BENCHMARK] {result['backend']} vs {REFERENCE}: {diff['to_valid']} invalid -> valid, {diff['to_invalid']} valid -> invalid")
+            for f in diff["files"][:args.show]:
+                print(f"    > {Path(f).name}: {reference['verdicts'][f]} -> {result['verdicts'][f]}")
+
+if __name__ == "__main__":
+    settings = Settings()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input_dir", type=Path, default=Path(settings.ko_dir))
+    parser.add_argument("--n", type=int, default=100, help="Documents sampled from the input directory (-1: all)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the sample, to compare runs on the same documents")
+    parser.add_argument("--backends", type=str, default=None, help="Comma-separated backends (default: every installed one)")
+    parser.add_argument("--show", type=int, default=10, help="Documents listed per backend whose verdict differs")
+    args = parser.parse_args()
+    main(args, settings)
@@ -13,8 +13,12 @@ def main(args, config: Settings):
     print(f" > Input file: {args.input}")
     print(f" > Output dir: {args.output}")
     print(f" > Limit (n):  {args.n if args.n > 0 else 'No limit'}")
+    print(f" > Concurrency: {args.concurrency}")
+    print(f" > Shard depth: {args.shard_depth}")
 
-    loader = DocLoader(config)
+    # stored files under hash-prefix subdirectories (see corpus.shard_path)
+    config = config.model_copy(update={"download_shard_depth": args.shard_depth})
+    loader = DocLoader(config, concurrency=args.concurrency)
     loader.load_batch(
         input_file=str(args.input),
         output_dir=str(args.output),
@@ -27,5 +31,7 @@ if __name__ == "__main__":
     parser.add_argument("--n", type=int, default=-1)
     parser.add_argument("--input", type=Path, default=Path(settings.doc_json_path))
     parser.add_argument("--output", type=Path, default=Path(settings.doc_dir))
+    parser.add_argument("--concurrency", type=int, default=settings.download_concurrency)
+    parser.add_argument("--shard_depth", type=int, default=settings.download_shard_depth)
     args = parser.parse_args()
     main(args, settings)
\ No newline at end of file
@@ -0,0 +1,34 @@
+# export_metadata.py
+# /script for exporting the result store as one JSON file per document/
+# adriana r.f.
+# feb-2026
+
+import argparse
+from pathlib import Path
+from doc_quality.config.settings import Settings
+from doc_quality.pipeline.metadata.store import ResultStore
+
+def main(args, config: Settings):
+    print(f"[DOCUMENT QUALITY APP] Metadata export")
+    print(f" > Result store:     {args.store_dir}")
+    print(f" > Valid meta dir:     {args.output_valid}")
+    print(f" > Invalid meta dir:   {args.output_invalid}")
+
+    if not ResultStore.exists(args.store_dir):
+        print(f"    > Warning: no result store in {args.store_dir}")
+        return
+    store = ResultStore(args.store_dir, read_only=True)
+    try:
+        n = store.export(str(args.output_valid), str(args.output_invalid))
+    finally:
+        store.close()
+    print(f"[EXPORT] {n} records written")
+
+if __name__ == "__main__":
+    settings = Settings()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--store_dir", type=Path, default=Path(settings.result_store_dir))
+    parser.add_argument("--output_valid", type=Path, default=Path(settings.valid_meta_dir))
+    parser.add_argument("--output_invalid", type=Path, default=Path(settings.invalid_meta_dir))
+    args = parser.parse_args()
+    main(args, settings)
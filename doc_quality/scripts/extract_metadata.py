@@ -11,24 +11,38 @@ from doc_quality.pipeline.metadata.extractor import DocMetadataExtractor
 def main(args, config: Settings):
     print(f"[DOCUMENT QUALITY APP] Metadata extraction")
     print(f" > Input dir:     {args.input_dir}")
-    print(f" > Valid meta dir:     {args.output_valid}")
-    print(f" > Invalid meta dir:   {args.output_invalid}")
-    print(f" > Max docs meta to extract:   {args.n_meta}")
+    print(f" > Result store:     {args.store_dir}")
+    if args.export_json:
+        print(f" > Valid meta dir:     {args.output_valid}")
+        print(f" > Invalid meta dir:   {args.output_invalid}")
+    print(f" > Max docs meta to extract:   {args.n_meta} (seed {args.seed})")
+    print(f" > Workers:   {args.workers}")
+    print(f" > Metadata requests in flight:   {args.concurrency}")
 
     extractor = DocMetadataExtractor(config)
+    extractor.json_export = args.export_json
     extractor.extract_all(
         input_dir=str(args.input_dir),
         valid_output=str(args.output_valid),
         invalid_output=str(args.output_invalid),
-        n=int(args.n_meta)
+        n=int(args.n_meta),
+        workers=int(args.workers),
+        concurrency=int(args.concurrency),
+        store_dir=str(args.store_dir),
+        seed=int(args.seed)
     )
 
 if __name__ == "__main__":
     settings = Settings()
     parser = argparse.ArgumentParser()
     parser.add_argument("--input_dir", type=Path, default=Path(settings.doc_dir))
+    parser.add_argument("--store_dir", type=Path, default=Path(settings.result_store_dir))
     parser.add_argument("--output_valid", type=Path, default=Path(settings.valid_meta_dir))
     parser.add_argument("--output_invalid", type=Path, default=Path(settings.invalid_meta_dir))
+    parser.add_argument("--export_json", action="store_true", default=settings.metadata_json_export, help="Also write one JSON file per document")
     parser.add_argument("--n_meta", type=int, default=-1, help="Max n documents to extract metadata from")
+    parser.add_argument("--seed", type=int, default=settings.metadata_sample_seed, help="Seed of the random sample of n_meta documents")
+    parser.add_argument("--workers", type=int, default=settings.metadata_workers, help="Processes for structural validation")
+    parser.add_argument("--concurrency", type=int, default=settings.metadata_concurrency, help="Metadata extraction requests in flight")
     args = parser.parse_args()
     main(args, settings)
\ No newline at end of file
@@ -20,7 +20,9 @@ def main(args, config: Settings):
     dl_args = Namespace(
         input=args.json_source,
         output=args.pdf_dir,
-        n=args.n
+        n=args.n,
+        concurrency=args.concurrency,
+        shard_depth=config.download_shard_depth
     )
     run_download(dl_args, config)
     print("\n-----------------------------------------\n")
@@ -28,15 +30,21 @@ def main(args, config: Settings):
     # then, extract their metadata
     meta_args = Namespace(
         input_dir=args.pdf_dir,
+        store_dir=args.store_dir,
+        export_json=args.export_json,
         output_valid=args.valid_dir,
-        output_invalid=args.invalid_dir
+        output_invalid=args.invalid_dir,
+        n_meta=-1,
+        seed=config.metadata_sample_seed,
+        workers=args.workers,
+        concurrency=args.meta_concurrency
     )
     run_metadata(meta_args, config)
     print("\n-----------------------------------------\n")
 
     # based on this metadata, run topic modeling
     topic_args = Namespace(
-        input_dir=args.valid_dir,
+        input_dir=args.store_dir,
         output_dir=args.topic_dir
     )
     run_topics(topic_args, config)
@@ -0,0 +1,55 @@
+# rescore.py
+# /script for rescoring the corpus with new heuristic thresholds/
+# adriana r.f.
+# feb-2026
+
+import argparse
+import time
+from pathlib import Path
+from doc_quality.config.settings import Settings
+from doc_quality.pipeline.quality.features import FeatureStore
+from doc_quality.pipeline.quality.rescore import current_thresholds, rescore, flips
+
+def _parse_overrides(pairs) -> dict:
+    overrides = {}
+    for pair in pairs or []:
+        name, _, value = pair.partition("=")
+        overrides[name.strip().upper()] = float(value)
+    return overrides
+
+def main(args, config: Settings):
+    print(f"[DOCUMENT QUALITY APP] Rescoring")
+    print(f" > Features:   {args.features}")
+
+    thresholds = current_thresholds(_parse_overrides(args.set))
+    for name, value in thresholds.items():
+        print(f" > {name}:   {value}")
+
+    start = time.perf_counter()
+    features = FeatureStore.load(str(args.features))
+    rescored = rescore(features, thresholds)
+    changes = flips(features, rescored)
+    elapsed = time.perf_counter() - start
+
+    print(f"[RESCORE] {changes['documents']} documents rescored in {elapsed:.3f}s")
+    print(f"    > Structurally valid: {changes['valid_before']} -> {changes['valid_after']}")
+    print(f"    > Invalid -> valid: {changes['to_valid']} ({changes['to_valid_without_metadata']} still need metadata extraction)")
+    print(f"    > Valid -> invalid: {changes['to_invalid']}")
+    print(f"    > Typology changes: {changes['typology_changes']}")
+    if changes["short_circuit"]:
+        print(f"    > Rejected before scoring (pre-screen, parsing budget): {changes['short_circuit']}, whatever the thresholds")
+    if changes["partial_text"]:
+        print(f"    > Warning: {changes['partial_text']} documents were decided early, their text stats only cover their first/last pages")
+
+    if args.output:
+        rescored.to_csv(args.output, index=False)
+        print(f"[RESCORE] Rescored verdicts saved to {args.output}")
+
+if __name__ == "__main__":
+    settings = Settings()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--features", type=Path, default=Path(settings.feature_store_path))
+    parser.add_argument("--set", action="append", metavar="NAME=VALUE", help="Threshold override, e.g. MIN_SCORE=7")
+    parser.add_argument("--output", type=Path, default=None, help="CSV with the rescored typology/score/verdict of every document")
+    args = parser.parse_args()
+    main(args, settings)
@@ -0,0 +1,45 @@
+# standin_server.py
+# /script for running a local stand-in of the metadata extraction service/
+# adriana r.f.
+# feb-2026
+
+import argparse
+import uvicorn
+from doc_quality.config.settings import Settings
+from doc_quality.pipeline.metadata.standin import LATENCIES, StandinProfile, create_standin_app
+
+def main(args, config: Settings):
+    profile = StandinProfile(
+        latency=args.latency,
+        latency_mean=args.latency_mean,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        max_rps=args.max_rps,
+        max_concurrent=args.max_concurrent,
+        seed=args.seed,
+        topics=list(config.topic_targets),
+    )
+    print(f"[DOCUMENT QUALITY APP] Metadata extraction stand-in")
+    print(f" > Latency:   {profile.latency} (mean {profile.latency_mean}s, sigma {profile.latency_sigma})")
+    print(f" > Errors:   {profile.error_rate:.0%} (500), {profile.throttle_rate:.0%} (429)")
+    print(f" > Caps:   {profile.max_rps or 'no'} req/s, {profile.max_concurrent or 'no'} concurrent requests")
+    print(f" > Point the pipeline at it:   EXTRACTION_ENDPOINT=http://{args.host}:{args.port}/extract (stats at /stats)")
+
+    uvicorn.run(create_standin_app(profile), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    settings = Settings()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=settings.standin_port)
+    parser.add_argument("--latency", choices=LATENCIES, default="lognormal", help="Latency distribution")
+    parser.add_argument("--latency_mean", type=float, default=2.0, help="Mean latency (seconds)")
+    parser.add_argument("--latency_sigma", type=float, default=0.5, help="Latency spread")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="Fraction of requests answered with a 500")
+    parser.add_argument("--throttle_rate", type=float, default=0.0, help="Fraction of requests answered with a 429")
+    parser.add_argument("--max_rps", type=float, default=0.0, help="Requests accepted per second (0 = unlimited)")
+    parser.add_argument("--max_concurrent", type=int, default=0, help="Requests handled at once (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed, for reproducible runs")
+    args = parser.parse_args()
+    main(args, settings)
@@ -11,7 +11,7 @@ from doc_quality.pipeline.topics.trainer import DocTopicTrainer
 
 def main(args, config: Settings):
     print(f"[DOCUMENT QUALITY APP] Topic modeling")
-    print(f" > Input meta dir:   {args.input_dir}")
+    print(f" > Input meta (store or dir):   {args.input_dir}")
     print(f" > Output model dir: {args.output_dir}")
 
     trainer = DocTopicTrainer(config)
@@ -23,7 +23,7 @@ def main(args, config: Settings):
 if __name__ == "__main__":
     settings = Settings()
     parser = argparse.ArgumentParser()
-    parser.add_argument("--input_dir", type=Path, default=Path(settings.valid_meta_dir))
+    parser.add_argument("--input_dir", type=Path, default=Path(settings.result_store_dir))
     parser.add_argument("--output_dir", type=Path, default=Path(settings.topic_model_dir))
     args = parser.parse_args()
     main(args, settings)
\ No newline at end of file